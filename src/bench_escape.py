@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from split_nodes import markdown_to_html_node
+
+# the serializer as it was before escaping, used as the reference timing
+def reference_props_to_html(self):
+    if not isinstance(self.props, dict):
+        return ""
+    else:
+        parts = [f' {key}="{value}"' for key, value in self.props.items()]
+        return "".join(parts)
+
+def reference_leaf_to_html(self):
+    if self.value == None:
+        raise ValueError
+    elif self.tag == None:
+        return self.value
+    elif self.props == None:
+        return (f'<{self.tag}>{self.value}</{self.tag}>')
+    else:
+        prop = super(LeafNode, self).props_to_html()
+        return (f'<{self.tag}{prop}>{self.value}</{self.tag}>')
+
+def reference_parent_to_html(self):
+    if self.tag == None:
+        raise ValueError
+    elif self.children == None:
+        raise ValueError("No Children")
+    elif not self.children:
+        return f'<{self.tag}{super(ParentNode, self).props_to_html()}></{self.tag}>'
+    else:
+        nodes = f'<{self.tag}{super(ParentNode, self).props_to_html()}>'
+        for child in self.children:
+            nodes += f'{child.to_html()}'
+        nodes += f'</{self.tag}>'
+        return nodes
+
+def load_corpus(content_dir):
+    corpus = []
+    for root, dirs, files in os.walk(content_dir):
+        for item in files:
+            if item.endswith(".md"):
+                with open(os.path.join(root, item), "r") as file:
+                    corpus.append(markdown_to_html_node(file.read()))
+    return corpus
+
+def time_to_html(corpus, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for node in corpus:
+            node.to_html()
+    return time.perf_counter() - start
+
+def use_reference(enabled, current):
+    if enabled:
+        LeafNode.to_html = reference_leaf_to_html
+        ParentNode.to_html = reference_parent_to_html
+        HTMLNode.props_to_html = reference_props_to_html
+    else:
+        LeafNode.to_html, ParentNode.to_html, HTMLNode.props_to_html = current
+
+# the site's own pages, wherever the script is run from
+DEFAULT_CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "content")
+
+def main():
+    content_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CONTENT_DIR
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    trials = int(sys.argv[3]) if len(sys.argv) > 3 else 15
+    corpus = load_corpus(content_dir)
+    if not corpus:
+        sys.exit(f"No markdown pages found under {content_dir}")
+
+    # interleave the two serializers and keep the best run of each to damp noise
+    current = (LeafNode.to_html, ParentNode.to_html, HTMLNode.props_to_html)
+    escaped = unescaped = None
+    try:
+        for _ in range(trials):
+            use_reference(True, current)
+            elapsed = time_to_html(corpus, rounds)
+            unescaped = elapsed if unescaped is None else min(unescaped, elapsed)
+            use_reference(False, current)
+            elapsed = time_to_html(corpus, rounds)
+            escaped = elapsed if escaped is None else min(escaped, elapsed)
+    finally:
+        use_reference(False, current)
+
+    overhead = (escaped - unescaped) / unescaped * 100
+    print(f"to_html x{rounds}: {unescaped:.4f}s unescaped, {escaped:.4f}s escaped ({overhead:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
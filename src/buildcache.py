@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+# bump whenever a change alters rendered output, so stale cache entries stop matching
+GENERATOR_VERSION = "5"
+CACHE_ENV_VAR = "SSG_CACHE_DIR"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+TEMP_PREFIX = ".tmp-"
+# in-flight writes from other builders are left alone; older ones were abandoned by a crash
+TEMP_GRACE_SECONDS = 60 * 60
+
+def content_hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+def atomic_copy(source_path, dest_path):
+    directory = os.path.dirname(dest_path)
+    os.makedirs(directory, exist_ok=True)
+    # concurrent builders may race on the same entry; each writes its own
+    # temp file and the rename makes whichever finishes last win atomically
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=TEMP_PREFIX)
+    try:
+        with os.fdopen(fd, "wb") as tmp, open(source_path, "rb") as source:
+            shutil.copyfileobj(source, tmp)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def atomic_write(dest_path, data):
+    directory = os.path.dirname(dest_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=TEMP_PREFIX)
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class BuildCache:
+    def __init__(self, root, max_bytes = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.context = ""
+        self.hits = 0
+        self.misses = 0
+
+    def set_context(self, *parts):
+        # build options that change every page's output (basepath, minify, ...)
+        self.context = content_hash(GENERATOR_VERSION, *parts)
+
+    def page_key(self, content, template):
+        return content_hash(self.context, content, template)
+
+    def path_for(self, namespace, key):
+        return os.path.join(self.root, namespace, key[:2], key)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def lookup(self, namespace, key):
+        path = self.path_for(namespace, key)
+        if not os.path.isfile(path):
+            self.misses += 1
+            return None
+        self._touch(path)
+        self.hits += 1
+        return path
+
+    def get_file(self, namespace, key, dest_path):
+        path = self.lookup(namespace, key)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, dest_path)
+        except FileNotFoundError:
+            # evicted by a concurrent gc between lookup and copy
+            self.hits -= 1
+            self.misses += 1
+            return False
+        return True
+
+    def put_file(self, namespace, key, source):
+        # source is a path on disk or the bytes already in memory
+        if isinstance(source, bytes):
+            atomic_write(self.path_for(namespace, key), source)
+        else:
+            atomic_copy(source, self.path_for(namespace, key))
+
+    def get_json(self, namespace, key):
+        path = self.path_for(namespace, key)
+        try:
+            with open(path, "r") as file:
+                value = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self._touch(path)
+        self.hits += 1
+        return value
+
+    def put_json(self, namespace, key, value):
+        atomic_write(self.path_for(namespace, key), json.dumps(value).encode("utf-8"))
+
+    def entries(self):
+        result = []
+        cutoff = time.time() - TEMP_GRACE_SECONDS
+        for root, dirs, files in os.walk(self.root):
+            for item in files:
+                path = os.path.join(root, item)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if item.startswith(TEMP_PREFIX) and stat.st_mtime > cutoff:
+                    continue
+                result.append((stat.st_mtime, stat.st_size, path))
+        return result
+
+    def gc(self, max_bytes = None):
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries())
+        total = sum(size for mtime, size, path in entries)
+        removed = 0
+        freed = 0
+        # least recently used first, reads bump the mtime
+        for mtime, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            freed += size
+            removed += 1
+        return removed, freed
+
+def cache_from_env(cache_dir = None, max_bytes = DEFAULT_MAX_BYTES):
+    cache_dir = cache_dir or os.environ.get(CACHE_ENV_VAR)
+    if not cache_dir:
+        return None
+    return BuildCache(cache_dir, max_bytes)
@@ -0,0 +1,126 @@
+import json
+import sys
+import time
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+class BuildLogger:
+    def __init__(self, level = "warning", stream = None, json_stream = None, progress = False, batch_size = 256):
+        self.level = LEVELS[level]
+        self.stream = sys.stdout if stream is None else stream
+        self.json_stream = json_stream
+        self.progress = progress
+        self.batch_size = batch_size
+        self.lines = []
+        self.events = []
+        self.progress_total = 0
+        self.progress_done = 0
+        self.progress_label = ""
+        self.progress_start = None
+        self.progress_drawn = 0.0
+        self.progress_visible = False
+        self.start = time.perf_counter()
+
+    def log(self, level, message, **fields):
+        if self.json_stream is not None:
+            event = {"time": round(time.time(), 3), "level": level, "message": message}
+            event.update(fields)
+            self.events.append(json.dumps(event, default=str))
+            if len(self.events) >= self.batch_size:
+                self._flush_events()
+        if LEVELS[level] < self.level:
+            return
+        self.lines.append(f"{level.upper()}: {message}" if LEVELS[level] >= LEVELS["warning"] else message)
+        # errors are never held back behind a batch
+        if level == "error" or len(self.lines) >= self.batch_size:
+            self._flush_lines()
+
+    def debug(self, message, **fields):
+        self.log("debug", message, **fields)
+
+    def info(self, message, **fields):
+        self.log("info", message, **fields)
+
+    def warning(self, message, **fields):
+        self.log("warning", message, **fields)
+
+    def error(self, message, **fields):
+        self.log("error", message, **fields)
+
+    def summary(self, message, **fields):
+        if self.json_stream is not None:
+            event = {"time": round(time.time(), 3), "level": "summary", "message": message}
+            event.update(fields)
+            self.events.append(json.dumps(event, default=str))
+        self.lines.append(message)
+        self._flush_lines()
+
+    def start_progress(self, total, label = "pages"):
+        self.progress_total = total
+        self.progress_done = 0
+        self.progress_label = label
+        self.progress_start = time.perf_counter()
+        self.progress_drawn = 0.0
+
+    def advance(self, count = 1):
+        self.progress_done += count
+        if not self.progress:
+            return
+        now = time.perf_counter()
+        # redraw at most ten times a second, the bar itself is terminal I/O
+        if now - self.progress_drawn >= 0.1 or self.progress_done >= self.progress_total:
+            self.progress_drawn = now
+            self._draw_progress(now)
+
+    def finish_progress(self):
+        if self.progress_visible:
+            self._draw_progress(time.perf_counter())
+            self.stream.write("\n")
+            self.progress_visible = False
+        self.progress_start = None
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def flush(self):
+        self._flush_lines()
+        self._flush_events()
+
+    def close(self):
+        self.finish_progress()
+        self.flush()
+
+    def _draw_progress(self, now, width = 24):
+        total = max(self.progress_total, 1)
+        done = min(self.progress_done, total)
+        filled = int(width * done / total)
+        elapsed = now - self.progress_start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        bar = "#" * filled + "-" * (width - filled)
+        self.stream.write(f"\r[{bar}] {done}/{self.progress_total} {self.progress_label} {rate:.1f}/s ETA {eta:.0f}s")
+        self.stream.flush()
+        self.progress_visible = True
+
+    def _flush_lines(self):
+        if not self.lines:
+            return
+        if self.progress_visible:
+            self.stream.write("\r\x1b[K")
+            self.progress_visible = False
+        self.stream.write("\n".join(self.lines) + "\n")
+        self.stream.flush()
+        self.lines = []
+
+    def _flush_events(self):
+        if not self.events:
+            return
+        self.json_stream.write("\n".join(self.events) + "\n")
+        self.json_stream.flush()
+        self.events = []
+
+log = BuildLogger()
+
+def configure(level = "warning", stream = None, json_stream = None, progress = False, batch_size = 256):
+    log.__init__(level, stream, json_stream, progress, batch_size)
+    return log
@@ -0,0 +1,62 @@
+import gzip
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import file_digest
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".svg", ".txt", ".xml", ".json")
+
+def list_compressible_files(dest_dir):
+    result = []
+    for root, dirs, files in os.walk(dest_dir):
+        dirs.sort()
+        for item in sorted(files):
+            if item.endswith(COMPRESSIBLE_EXTENSIONS):
+                result.append(os.path.join(root, item))
+    return result
+
+def compress_file(path, level = 9, cache = None, cache_key = None):
+    with open(path, "rb") as file:
+        data = file.read()
+    # mtime=0 keeps the .gz bytes identical for identical input
+    compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    with open(f"{path}.gz", "wb") as file:
+        file.write(compressed)
+    if cache is not None:
+        cache.put_file("gzip", cache_key, compressed)
+    return len(data), len(compressed)
+
+def precompress_directory(dest_dir, manifest, level = 9, workers = None, cache = None):
+    start = time.perf_counter()
+    stats = {"files": 0, "skipped": 0, "original_bytes": 0, "compressed_bytes": 0}
+    pending = []
+    for path in list_compressible_files(dest_dir):
+        digest = file_digest(path)
+        key = f"{path}:{level}"
+        cache_key = f"{digest}-{level}"
+        if manifest.get("gzip", key) == digest:
+            if os.path.exists(f"{path}.gz"):
+                stats["skipped"] += 1
+                continue
+            # the output tree is wiped on every build, restore from the cache;
+            # get_file reports a miss if a concurrent gc evicted the blob
+            if cache is not None and cache.get_file("gzip", cache_key, f"{path}.gz"):
+                stats["skipped"] += 1
+                continue
+        pending.append((path, key, digest, cache_key))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda entry: compress_file(entry[0], level, cache, entry[3]), pending)
+        for (path, key, digest, cache_key), (original, compressed) in zip(pending, results):
+            manifest.set("gzip", key, digest)
+            stats["files"] += 1
+            stats["original_bytes"] += original
+            stats["compressed_bytes"] += compressed
+
+    stats["seconds"] = time.perf_counter() - start
+    if stats["original_bytes"]:
+        stats["ratio"] = stats["compressed_bytes"] / stats["original_bytes"]
+    else:
+        stats["ratio"] = 1.0
+    return stats
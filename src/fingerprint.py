@@ -0,0 +1,42 @@
+import json
+import os
+import re
+
+from manifest import file_digest
+
+ASSET_URL_RE = re.compile(r'(href|src)="(/[^"#?]*)([^"]*)"')
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+def fingerprint_name(name, digest, length = 6):
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest[:length]}{ext}"
+
+def cached_file_digest(path, manifest = None):
+    if manifest is None:
+        return file_digest(path)
+    stat = os.stat(path)
+    entry = manifest.get("assets", path)
+    if entry is not None and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        return entry["digest"]
+    digest = file_digest(path)
+    manifest.set("assets", path, {"mtime": stat.st_mtime_ns, "size": stat.st_size, "digest": digest})
+    return digest
+
+def rewrite_asset_urls(html, asset_map):
+    if not asset_map:
+        return html
+
+    def replace(match):
+        attribute, url, suffix = match.groups()
+        return f'{attribute}="{asset_map.get(url, url)}{suffix}"'
+
+    return ASSET_URL_RE.sub(replace, html)
+
+def write_asset_manifest(asset_map, dest_dir, output = None):
+    path = os.path.join(dest_dir, ASSET_MANIFEST_NAME)
+    data = json.dumps(asset_map, indent=2, sort_keys=True).encode("utf-8")
+    if output is None:
+        with open(path, "wb") as file:
+            file.write(data)
+    else:
+        output.write_bytes(path, data)
@@ -0,0 +1,138 @@
+import hashlib
+import re
+
+from htmlnode import LeafNode
+
+def _lexer(*rules):
+    # one alternation per language, compiled once at import
+    return re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in rules), re.MULTILINE)
+
+def _words(*words):
+    return r"\b(?:" + "|".join(words) + r")\b"
+
+C_COMMENT = r"//[^\n]*|/\*[\s\S]*?\*/"
+DOUBLE_STRING = r'"(?:[^"\\\n]|\\.)*"'
+SINGLE_STRING = r"'(?:[^'\\\n]|\\.)*'"
+NUMBER = r"\b(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+
+LEXERS = {
+    "python": _lexer(
+        ("comment", r"#[^\n]*"),
+        ("string", r"(?i:[rbfu]{0,2})(?:'''[\s\S]*?'''|\"\"\"[\s\S]*?\"\"\"|" + DOUBLE_STRING + "|" + SINGLE_STRING + ")"),
+        ("number", NUMBER),
+        ("keyword", _words(
+            "False", "None", "True", "and", "as", "assert", "async", "await", "break", "class", "continue",
+            "def", "del", "elif", "else", "except", "finally", "for", "from", "global", "if", "import", "in",
+            "is", "lambda", "nonlocal", "not", "or", "pass", "raise", "return", "try", "while", "with", "yield",
+        )),
+        ("builtin", _words(
+            "print", "len", "range", "open", "str", "int", "float", "list", "dict", "set", "tuple",
+            "isinstance", "super", "enumerate", "zip", "map", "filter", "sorted", "self",
+        )),
+    ),
+    "javascript": _lexer(
+        ("comment", C_COMMENT),
+        ("string", DOUBLE_STRING + "|" + SINGLE_STRING + r"|`(?:[^`\\]|\\.)*`"),
+        ("number", NUMBER),
+        ("keyword", _words(
+            "async", "await", "break", "case", "catch", "class", "const", "continue", "default", "delete",
+            "do", "else", "export", "extends", "false", "finally", "for", "function", "if", "import", "in",
+            "instanceof", "let", "new", "null", "of", "return", "switch", "this", "throw", "true", "try",
+            "typeof", "undefined", "var", "void", "while", "yield",
+        )),
+        ("builtin", _words("console", "document", "window", "Math", "JSON", "Promise", "Object", "Array")),
+    ),
+    "go": _lexer(
+        ("comment", C_COMMENT),
+        ("string", DOUBLE_STRING + r"|`[^`]*`|'(?:[^'\\\n]|\\.)+'"),
+        ("number", NUMBER),
+        ("keyword", _words(
+            "break", "case", "chan", "const", "continue", "default", "defer", "else", "fallthrough", "for",
+            "func", "go", "goto", "if", "import", "interface", "map", "package", "range", "return", "select",
+            "struct", "switch", "type", "var", "true", "false", "nil",
+        )),
+        ("builtin", _words("append", "cap", "len", "make", "new", "panic", "recover", "fmt", "string", "int", "error")),
+    ),
+    "bash": _lexer(
+        ("comment", r"(?<![\w$])#[^\n]*"),
+        ("string", DOUBLE_STRING + r"|'[^']*'"),
+        ("variable", r"\$\{[^}\n]*\}|\$\w+"),
+        ("keyword", _words(
+            "if", "then", "else", "elif", "fi", "for", "while", "until", "do", "done", "case", "esac",
+            "function", "in", "return", "local", "export",
+        )),
+        ("builtin", _words("echo", "cd", "exit", "set", "source", "read", "printf", "test")),
+    ),
+    "css": _lexer(
+        ("comment", r"/\*[\s\S]*?\*/"),
+        ("string", DOUBLE_STRING + "|" + SINGLE_STRING),
+        ("property", r"[\w-]+(?=\s*:[^:{]*[;}])"),
+        ("number", r"#[0-9a-fA-F]{3,8}\b|-?\b\d+(?:\.\d+)?(?:px|em|rem|%|vh|vw|s|ms)?"),
+        ("keyword", r"@[\w-]+|!important"),
+    ),
+    "json": _lexer(
+        ("property", DOUBLE_STRING + r"(?=\s*:)"),
+        ("string", DOUBLE_STRING),
+        ("number", r"-?" + NUMBER),
+        ("keyword", _words("true", "false", "null")),
+    ),
+}
+
+ALIASES = {
+    "py": "python",
+    "js": "javascript",
+    "golang": "go",
+    "sh": "bash",
+    "shell": "bash",
+}
+
+memo = {}
+store = None
+
+def configure(backing_store = None):
+    # backing_store needs get_json/put_json, e.g. a BuildCache,
+    # so snippets lexed by one build are reused by the next
+    global store
+    store = backing_store
+    # called once per build, so the in-process memo never outgrows one site
+    memo.clear()
+
+def language_for(info):
+    language = info.strip().split(" ")[0].lower() if info else ""
+    return ALIASES.get(language, language)
+
+def tokenize(language, code):
+    lexer = LEXERS[language]
+    tokens = []
+    position = 0
+    for match in lexer.finditer(code):
+        if match.start() > position:
+            tokens.append([None, code[position:match.start()]])
+        tokens.append([match.lastgroup, match.group()])
+        position = match.end()
+    if position < len(code):
+        tokens.append([None, code[position:]])
+    return tokens
+
+def cached_tokens(language, code):
+    key = f"{hashlib.sha256(code.encode('utf-8')).hexdigest()}-{language}"
+    tokens = memo.get(key)
+    if tokens is None and store is not None:
+        tokens = store.get_json("highlight", key)
+    if tokens is None:
+        tokens = tokenize(language, code)
+        if store is not None:
+            store.put_json("highlight", key, tokens)
+    memo[key] = tokens
+    return tokens
+
+def highlight_to_nodes(language, code):
+    if language not in LEXERS:
+        return [LeafNode(None, code)]
+    nodes = []
+    for kind, text in cached_tokens(language, code):
+        if kind is None:
+            nodes.append(LeafNode(None, text))
+        else:
+            nodes.append(LeafNode("span", text, {"class": f"tok-{kind}"}))
+    return nodes
@@ -1,3 +1,11 @@
+VOID_ELEMENTS = ("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr")
+
+def escape_text(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def escape_attribute(value):
+    return escape_text(str(value)).replace('"', "&quot;")
+
 class HTMLNode:
     def __init__(self, tag = None, value = None, children = None, props = None):
         self.tag = tag
@@ -12,7 +20,11 @@ class HTMLNode:
         if not isinstance(self.props, dict):
             return ""
         else:
-            parts = [f' {key}="{value}"' for key, value in self.props.items()]
+            parts = []
+            for key, value in self.props.items():
+                if type(value) is not str or "&" in value or "<" in value or ">" in value or '"' in value:
+                    value = escape_attribute(value)
+                parts.append(f' {key}="{value}"')
             return "".join(parts)
 
     def __repr__(self):
@@ -23,30 +35,31 @@ class LeafNode(HTMLNode):
         super().__init__(tag, value, None, props)
     
     def to_html(self):
-        if self.value == None:
+        value = self.value
+        if value is None:
             raise ValueError
-        elif self.tag == None:
-            return self.value
-        elif self.props == None:
-            return (f'<{self.tag}>{self.value}</{self.tag}>')
+        # fast path: most prose has nothing to escape
+        if "&" in value or "<" in value or ">" in value:
+            value = escape_text(value)
+        tag = self.tag
+        if tag is None:
+            return value
+        elif tag in VOID_ELEMENTS:
+            return f'<{tag}{self.props_to_html()}>'
+        elif self.props is None:
+            return f'<{tag}>{value}</{tag}>'
         else:
-            prop = super().props_to_html()
-            return (f'<{self.tag}{prop}>{self.value}</{self.tag}>')
+            return f'<{tag}{self.props_to_html()}>{value}</{tag}>'
     
 class ParentNode(HTMLNode):
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
     
     def to_html(self):
-        if self.tag == None:
+        if self.tag is None:
             raise ValueError
-        elif self.children == None:
+        elif self.children is None:
             raise ValueError("No Children")
-        elif not self.children:
-            return f'<{self.tag}{super().props_to_html()}></{self.tag}>'
         else:
-            nodes = f'<{self.tag}{super().props_to_html()}>'
-            for child in self.children:
-                nodes += f'{child.to_html()}'
-            nodes += f'</{self.tag}>'
-            return nodes
+            inner = "".join([child.to_html() for child in self.children])
+            return f'<{self.tag}{self.props_to_html()}>{inner}</{self.tag}>'
@@ -0,0 +1,126 @@
+import os
+import struct
+
+from fingerprint import cached_file_digest
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) do not
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _png_size(head):
+    if len(head) < 24 or head[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", head[16:24])
+
+def _gif_size(head):
+    if len(head) < 10:
+        return None
+    return struct.unpack("<HH", head[6:10])
+
+def _webp_size(head):
+    chunk = head[12:16]
+    # every variant reads up to byte 30 at most; VP8L stops at 25
+    if len(head) < (25 if chunk == b"VP8L" else 30):
+        return None
+    if chunk == b"VP8X":
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return width, height
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and head[20:21] == b"\x2f":
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    return None
+
+def _jpeg_size(file):
+    file.seek(2)
+    while True:
+        marker = file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        # fill bytes may pad between segments
+        while marker[1] == 0xFF:
+            fill = file.read(1)
+            if not fill:
+                return None
+            marker = marker[1:] + fill
+        code = marker[1]
+        if code == 0xD8 or 0xD0 <= code <= 0xD7:
+            continue
+        length_bytes = file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        # the length counts its own two bytes; anything less would seek backwards forever
+        if length < 2:
+            return None
+        if code in JPEG_SOF_MARKERS:
+            frame = file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        file.seek(length - 2, os.SEEK_CUR)
+
+def read_image_size(path):
+    with open(path, "rb") as file:
+        head = file.read(30)
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return _png_size(head)
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return _gif_size(head)
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _webp_size(head)
+        if head[:2] == b"\xff\xd8":
+            return _jpeg_size(file)
+    return None
+
+class ImageSizer:
+    def __init__(self, static_dir, manifest = None, cache = None):
+        self.static_dir = static_dir
+        self.manifest = manifest
+        self.cache = cache
+
+    def state_key(self):
+        # pages embed image sizes, so cached pages must be keyed on the images too
+        parts = []
+        for root, dirs, files in os.walk(self.static_dir):
+            dirs.sort()
+            for item in sorted(files):
+                path = os.path.join(root, item)
+                parts.append(f"{os.path.relpath(path, self.static_dir)}:{cached_file_digest(path, self.manifest)}")
+        return "\n".join(parts)
+
+    def size_of(self, url):
+        if not url or not url.startswith("/"):
+            return None
+        path = os.path.join(self.static_dir, url.lstrip("/"))
+        if not os.path.isfile(path):
+            return None
+        if self.manifest is None:
+            return read_image_size(path)
+        digest = cached_file_digest(path, self.manifest)
+        size = self.manifest.get("image_sizes", digest)
+        if size is None and self.cache is not None:
+            size = self.cache.get_json("images", digest)
+        if size is None:
+            size = read_image_size(path)
+            if size is None:
+                return None
+            if self.cache is not None:
+                self.cache.put_json("images", digest, list(size))
+        self.manifest.set("image_sizes", digest, list(size))
+        return tuple(size)
+
+    def annotate(self, node):
+        if node.tag == "img" and node.props is not None:
+            size = self.size_of(node.props.get("src"))
+            if size is not None:
+                node.props["width"] = size[0]
+                node.props["height"] = size[1]
+            node.props.setdefault("loading", "lazy")
+            node.props.setdefault("decoding", "async")
+        for child in node.children:
+            self.annotate(child)
+        return node
@@ -1,33 +1,187 @@
+import argparse
+import json
 import os
 import shutil
 import sys
+import traceback
 
 from textnode import TextNode, TextType
-from split_nodes import generate_page_recursive
+from split_nodes import generate_page_recursive, BuildContext
+from manifest import Manifest
+from compress import precompress_directory
+from fingerprint import cached_file_digest, fingerprint_name, write_asset_manifest
+from imagesize import ImageSizer
+from buildlog import configure, log
+from buildcache import cache_from_env, content_hash, BuildCache, CACHE_ENV_VAR, DEFAULT_MAX_BYTES, GENERATOR_VERSION
+from templates import TemplateLoader, DependencyGraph
+import highlight
+from manifest import CACHE_DIR
+from output import DirectoryOutput, ArchiveOutput
 
 
-def copy_directory_contents(source_dir, dest_dir, is_initial_call = True):
-    if is_initial_call:
+def copy_directory_contents(source_dir, dest_dir, is_initial_call = True, asset_map = None, manifest = None, url_prefix = "/", output = None, wipe = True):
+    if is_initial_call and wipe:
         if os.path.exists(dest_dir):
             shutil.rmtree(dest_dir)
         os.makedirs(dest_dir)
-    static = os.listdir(source_dir)
+    output = DirectoryOutput(dest_dir) if output is None else output
+    copied = 0
+    # sorted so archives list their entries in a stable order
+    static = sorted(os.listdir(source_dir))
     for item in static:
         if os.path.isfile(os.path.join(source_dir, item)):
-            print(f"Copying file: {os.path.join(source_dir, item)}")
-            shutil.copy(os.path.join(source_dir, item), os.path.join(dest_dir, item))
+            dest_item = item
+            if asset_map is not None:
+                digest = cached_file_digest(os.path.join(source_dir, item), manifest)
+                dest_item = fingerprint_name(item, digest)
+                asset_map[f"{url_prefix}{item}"] = f"{url_prefix}{dest_item}"
+            log.info(f"Copying file: {os.path.join(source_dir, item)}", event="copy", source=os.path.join(source_dir, item))
+            output.copy_file(os.path.join(dest_dir, dest_item), os.path.join(source_dir, item))
+            copied += 1
         else:
-            os.makedirs(os.path.join(dest_dir, item))
-            copy_directory_contents(os.path.join(source_dir, item), os.path.join(dest_dir, item), False)
+            copied += copy_directory_contents(os.path.join(source_dir, item), os.path.join(dest_dir, item), False, asset_map, manifest, f"{url_prefix}{item}/", output, wipe)
+    return copied
+
+def count_pages(dir_path_content):
+    return sum(1 for root, dirs, files in os.walk(dir_path_content) for item in files if item.endswith(".md"))
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site into ./docs")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--templates-dir", default="templates", help="directory holding partials/ and per-section templates")
+    parser.add_argument("--incremental", action="store_true", help="keep docs/ and only rebuild pages whose source or template chain changed")
+    parser.add_argument("--archive", default=None, metavar="PATH", help="write the site into a .tar, .tar.gz or .zip instead of docs/")
+    parser.add_argument("--minify", action="store_true", help="collapse whitespace in rendered pages")
+    parser.add_argument("--fingerprint", action="store_true", help="copy static assets under content-hashed names")
+    parser.add_argument("--image-sizes", action="store_true", help="add width/height and lazy loading to local <img> tags")
+    parser.add_argument("--gzip", action="store_true", help="write precompressed .gz siblings of text assets")
+    parser.add_argument("--gzip-level", type=int, default=9, choices=range(1, 10), metavar="1-9")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every copied file and generated page")
+    parser.add_argument("--log-level", choices=["debug", "info", "warning", "error"], default=None)
+    parser.add_argument("--progress", action="store_true", help="show a progress bar with pages/sec and ETA")
+    parser.add_argument("--log-json", default=None, metavar="PATH", help="write a JSON-lines event stream for CI")
+    parser.add_argument("--workers", type=int, default=None, help="thread pool size for post-render stages")
+    add_cache_args(parser)
+    args = parser.parse_args(argv)
+    if args.archive is not None:
+        if not args.archive.endswith((".tar", ".tar.gz", ".tgz", ".zip")):
+            parser.error("--archive must end in .tar, .tar.gz, .tgz or .zip")
+        # both stages work on the docs/ tree, which archive mode never writes
+        if args.gzip or args.incremental:
+            parser.error("--archive cannot be combined with --gzip or --incremental")
+    return args
+
+def add_cache_args(parser):
+    parser.add_argument("--cache-dir", default=None, help=f"shared build cache directory (default: ${CACHE_ENV_VAR})")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="evict least recently used cache entries above this size")
+
+def gc_main(argv):
+    parser = argparse.ArgumentParser(prog="main.py gc", description="Evict entries from the shared build cache")
+    add_cache_args(parser)
+    args = parser.parse_args(argv)
+    cache = cache_from_env(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    if cache is None:
+        log.error(f"No cache directory given, pass --cache-dir or set ${CACHE_ENV_VAR}")
+        log.close()
+        sys.exit(2)
+    removed, freed = cache.gc()
+    log.summary(f"Removed {removed} cache entries, freed {freed} bytes", event="gc", removed=removed, freed=freed)
+    log.close()
 
 def main():
-    copy_directory_contents("./static", "./docs")
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+    if sys.argv[1:2] == ["gc"]:
+        return gc_main(sys.argv[2:])
+    args = parse_args(sys.argv[1:])
+    level = args.log_level or ("info" if args.verbose else "warning")
+    json_stream = open(args.log_json, "w") if args.log_json else None
+    configure(level, json_stream=json_stream, progress=args.progress)
+    try:
+        build(args)
+    except Exception as error:
+        log.error(f"Build failed: {error}", event="failed", error=repr(error), source=getattr(error, "path", None))
+        # the full traceback is shown with -v and always lands in the json log
+        log.info(traceback.format_exc().rstrip(), event="traceback")
+        sys.exit(1)
+    finally:
+        log.close()
+        if json_stream is not None:
+            json_stream.close()
+
+def render_site(args, manifest, asset_map, cache, store, output):
+    # docs/ is only wiped for a full directory build
+    wipe = args.archive is None and not args.incremental
+    if args.incremental:
+        os.makedirs("./docs", exist_ok=True)
+    copied = copy_directory_contents("./static", "./docs", asset_map=asset_map, manifest=manifest, output=output, wipe=wipe)
+    if asset_map is not None:
+        write_asset_manifest(asset_map, "./docs", output)
+    image_sizer = ImageSizer("./static", manifest, cache) if args.image_sizes else None
+    context = (
+        args.basepath,
+        str(args.minify),
+        json.dumps(asset_map, sort_keys=True),
+        image_sizer.state_key() if image_sizer is not None else "",
+    )
+    if cache is not None:
+        cache.set_context(*context)
+    highlight.configure(store)
+    templates = TemplateLoader(args.templates_dir, "content")
+    # archives leave docs/ alone, so only directory builds may describe it in the manifest
+    graph = DependencyGraph(manifest, content_hash(GENERATOR_VERSION, *context), args.incremental) if args.archive is None else None
+    if graph is not None:
+        for template_path in graph.changed_templates():
+            dependents = graph.dependents(template_path)
+            log.info(
+                f"{template_path} changed, rebuilding {len(dependents)} dependent pages",
+                event="template_changed", template=template_path, dependents=dependents
+            )
+    log.start_progress(count_pages("content"))
+    build = BuildContext(args.minify, asset_map, image_sizer, cache, templates, graph, output)
+    generate_page_recursive("content", "template.html", "docs", args.basepath, build)
+    log.finish_progress()
+    # progress counts every page visited, up to date ones included
+    skipped = graph.fresh if args.incremental else 0
+    pages = log.progress_done - skipped
+    if graph is not None:
+        for dest_path in graph.prune():
+            log.info(f"Removed stale page {dest_path}", event="page_removed", dest=dest_path)
+    return pages, skipped, copied
+
+def build(args):
+    manifest = Manifest()
+    asset_map = {} if args.fingerprint else None
+    cache = cache_from_env(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    # without a shared cache, derived artifacts still live in a local one under the same size cap
+    store = cache if cache is not None else BuildCache(CACHE_DIR, args.cache_max_mb * 1024 * 1024)
+    if args.archive is not None:
+        output = ArchiveOutput("./docs", args.archive)
+    else:
+        output = DirectoryOutput("./docs")
+    try:
+        pages, skipped, copied = render_site(args, manifest, asset_map, cache, store, output)
+    finally:
+        output.close()
+    if args.gzip:
+        stats = precompress_directory("docs", manifest, args.gzip_level, args.workers, store)
+        log.summary(
+            f"Compressed {stats['files']} files ({stats['skipped']} up to date): "
+            f"{stats['original_bytes']} -> {stats['compressed_bytes']} bytes "
+            f"(ratio {stats['ratio']:.2f}) in {stats['seconds']:.3f}s",
+            event="gzip", **stats
+        )
+    manifest.save()
+    if cache is not None:
+        removed, freed = cache.gc()
+        log.summary(
+            f"Cache: {cache.hits} hits, {cache.misses} misses, evicted {removed} entries ({freed} bytes)",
+            event="cache", hits=cache.hits, misses=cache.misses, evicted=removed, freed=freed
+        )
     else:
-        basepath = "/"
-    generate_page_recursive("content", "template.html", "docs", basepath)
+        removed, freed = store.gc()
+        log.debug(f"Local cache: evicted {removed} entries ({freed} bytes)", event="local_cache", evicted=removed, freed=freed)
+    built = f"Built {pages} pages, skipped {skipped} up to date," if args.incremental else f"Built {pages} pages and"
+    log.summary(f"{built} copied {copied} files in {log.elapsed():.2f}s", event="done", pages=pages, skipped=skipped, copied=copied)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,38 @@
+import hashlib
+import json
+import os
+
+MANIFEST_PATH = ".build_manifest.json"
+CACHE_DIR = ".build_cache"
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class Manifest:
+    def __init__(self, path = MANIFEST_PATH):
+        self.path = path
+        self.entries = {}
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as file:
+                try:
+                    self.entries = json.load(file)
+                except json.JSONDecodeError:
+                    self.entries = {}
+
+    def get(self, section, key):
+        return self.entries.get(section, {}).get(key)
+
+    def set(self, section, key, value):
+        self.entries.setdefault(section, {})[key] = value
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.entries, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,100 @@
+import re
+import time
+
+TOKEN_RE = re.compile(r"<[^>]*>|[^<]+")
+TAG_NAME_RE = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+PRESERVE_TAGS = ("pre", "code", "textarea", "script", "style")
+# whitespace between two of these never renders, anywhere else it separates words
+BLOCK_TAGS = {
+    "html", "head", "body", "title", "meta", "link", "script", "style", "base",
+    "div", "p", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "dl", "dt", "dd",
+    "pre", "blockquote", "hr", "br", "table", "thead", "tbody", "tfoot", "tr", "td", "th",
+    "header", "footer", "nav", "main", "section", "article", "aside", "figure", "figcaption", "form",
+}
+
+def is_block_tag(token):
+    match = TAG_NAME_RE.match(token)
+    # doctypes and comments never render as text either
+    return match is None or match.group(2).lower() in BLOCK_TAGS
+
+class HTMLMinifier:
+    def __init__(self):
+        self.pending = ""
+        self.preserve_depth = 0
+        self.after_block = True
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # only time spent inside feed/close, not in whatever produces the chunks
+        self.seconds = 0.0
+
+    def feed(self, chunk):
+        start = time.perf_counter()
+        self.bytes_in += len(chunk.encode("utf-8"))
+        data = self.pending + chunk
+        self.pending = ""
+        # an unterminated tag continues in the next chunk
+        cut = data.rfind("<")
+        if cut != -1 and data.find(">", cut) == -1:
+            self.pending = data[cut:]
+            data = data[:cut]
+        # trailing whitespace can only be collapsed once we know what follows it
+        # rstrip is linear, a \s+$ search restarts at every space of a long run
+        stripped = data.rstrip()
+        if len(stripped) < len(data):
+            self.pending = data[len(stripped):] + self.pending
+            data = stripped
+        result = self._emit(data)
+        self.seconds += time.perf_counter() - start
+        return result
+
+    def close(self):
+        start = time.perf_counter()
+        data = self.pending
+        self.pending = ""
+        result = self._emit(data)
+        self.seconds += time.perf_counter() - start
+        return result
+
+    def _emit(self, data):
+        out = []
+        tokens = TOKEN_RE.findall(data)
+        for i, token in enumerate(tokens):
+            if token.startswith("<"):
+                self._track_tag(token)
+                out.append(token)
+                self.after_block = is_block_tag(token)
+            elif self.preserve_depth:
+                out.append(token)
+                self.after_block = False
+            elif token.isspace():
+                # trailing whitespace is held back by feed, so only the end of the page has no next token
+                following = tokens[i + 1] if i + 1 < len(tokens) else None
+                if not (self.after_block and (following is None or is_block_tag(following))):
+                    out.append(" ")
+            else:
+                out.append(WHITESPACE_RE.sub(" ", token))
+                self.after_block = False
+        result = "".join(out)
+        self.bytes_out += len(result.encode("utf-8"))
+        return result
+
+    def _track_tag(self, token):
+        match = TAG_NAME_RE.match(token)
+        if match is None or match.group(2).lower() not in PRESERVE_TAGS:
+            return
+        if match.group(1):
+            self.preserve_depth = max(0, self.preserve_depth - 1)
+        elif not token.endswith("/>"):
+            self.preserve_depth += 1
+
+def minify_chunks(chunks, minifier = None):
+    minifier = HTMLMinifier() if minifier is None else minifier
+    for chunk in chunks:
+        output = minifier.feed(chunk)
+        if output:
+            yield output
+    output = minifier.close()
+    if output:
+        yield output
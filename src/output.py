@@ -0,0 +1,110 @@
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import zipfile
+
+# fixed metadata so an unchanged site produces a byte-identical archive
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+FILE_MODE = 0o644
+
+class DirectoryOutput:
+    def __init__(self, root):
+        self.root = root
+
+    def write_chunks(self, dest_path, chunks):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "w") as file:
+            for chunk in chunks:
+                file.write(chunk)
+        return dest_path
+
+    def write_bytes(self, dest_path, data):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "wb") as file:
+            file.write(data)
+        return dest_path
+
+    def copy_file(self, dest_path, source_path):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copyfile(source_path, dest_path)
+
+    def close(self):
+        pass
+
+class ArchiveOutput:
+    def __init__(self, root, archive_path):
+        self.root = root
+        self.archive_path = archive_path
+        self.names = set()
+        self.raw = None
+        self.compressed = None
+        self.tar = None
+        self.zip = None
+        if archive_path.endswith(".zip"):
+            self.zip = zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED)
+        elif archive_path.endswith((".tar.gz", ".tgz")):
+            self.raw = open(archive_path, "wb")
+            # tarfile's own w:gz stamps the current time and filename into the header
+            self.compressed = gzip.GzipFile(filename="", mode="wb", fileobj=self.raw, mtime=0)
+            self.tar = tarfile.open(fileobj=self.compressed, mode="w", format=tarfile.GNU_FORMAT)
+        elif archive_path.endswith(".tar"):
+            self.raw = open(archive_path, "wb")
+            self.tar = tarfile.open(fileobj=self.raw, mode="w", format=tarfile.GNU_FORMAT)
+        else:
+            raise ValueError(f"Unsupported archive type: {archive_path}")
+
+    def arcname(self, dest_path):
+        name = os.path.relpath(dest_path, self.root).replace(os.sep, "/")
+        if name in self.names:
+            raise ValueError(f"Duplicate archive entry: {name}")
+        self.names.add(name)
+        return name
+
+    def _tarinfo(self, name, size):
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = 0
+        info.mode = FILE_MODE
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    def _zipinfo(self, name):
+        info = zipfile.ZipInfo(name, date_time=ZIP_EPOCH)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = FILE_MODE << 16
+        return info
+
+    def write_bytes(self, dest_path, data):
+        name = self.arcname(dest_path)
+        if self.zip is not None:
+            self.zip.writestr(self._zipinfo(name), data)
+        else:
+            self.tar.addfile(self._tarinfo(name, len(data)), io.BytesIO(data))
+        return data
+
+    def write_chunks(self, dest_path, chunks):
+        # tar headers carry the size up front, so a page is held until it is complete
+        return self.write_bytes(dest_path, "".join(chunks).encode("utf-8"))
+
+    def copy_file(self, dest_path, source_path):
+        with open(source_path, "rb") as source:
+            name = self.arcname(dest_path)
+            if self.zip is not None:
+                with self.zip.open(self._zipinfo(name), "w") as dest:
+                    shutil.copyfileobj(source, dest)
+            else:
+                size = os.fstat(source.fileno()).st_size
+                self.tar.addfile(self._tarinfo(name, size), source)
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+        if self.tar is not None:
+            self.tar.close()
+        if self.compressed is not None:
+            self.compressed.close()
+        if self.raw is not None:
+            self.raw.close()
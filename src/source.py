@@ -0,0 +1,59 @@
+import hashlib
+import mmap
+import re
+
+# one newline in any convention; \r is only a newline on its own so \r\n is not counted twice
+NEWLINE = rb"(?:\r\n|\r(?!\n)|\n)"
+BLOCK_SEPARATOR_RE = re.compile(NEWLINE + NEWLINE)
+TITLE_BYTES_RE = re.compile(rb"^#(?!#)([^\r\n]+)", re.MULTILINE)
+
+class MarkdownSource:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = b""
+        # mmap refuses empty files
+        if self.file.seek(0, 2) > 0:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def digest(self):
+        return hashlib.sha256(self.data).hexdigest()
+
+    def title(self):
+        # the search stops at the first h1 instead of splitting the whole document
+        match = TITLE_BYTES_RE.search(self.data)
+        if match is None:
+            raise Exception("No valid h1 header")
+        heading = match.group(1).decode("utf-8").strip()
+        if heading == "":
+            raise Exception("No valid h1 header")
+        return heading
+
+    def blocks(self):
+        # decode one block at a time so only the current block lives as a str
+        position = 0
+        for match in BLOCK_SEPARATOR_RE.finditer(self.data):
+            block = self._decode(position, match.start())
+            position = match.end()
+            if block:
+                yield block
+        block = self._decode(position, len(self.data))
+        if block:
+            yield block
+
+    def _decode(self, start, end):
+        text = self.data[start:end].decode("utf-8")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text.strip()
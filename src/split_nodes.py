@@ -3,11 +3,22 @@ import os
 from enum import Enum
 
 from textnode import TextNode, TextType
-from htmlnode import HTMLNode, ParentNode, LeafNode
+from htmlnode import HTMLNode, ParentNode, LeafNode, escape_text
 from text_to_html import text_node_to_html_node
+from minify import HTMLMinifier, minify_chunks
+from fingerprint import rewrite_asset_urls
+from buildlog import log
+from manifest import file_digest
+from templates import TemplateLoader
+from highlight import highlight_to_nodes, language_for
+from output import DirectoryOutput
+from source import MarkdownSource
 
 BlockType = Enum("BlockType", ["PARAGRAPH", "HEADING", "CODE", "QUOTE", "UNORDERED_LIST", "ORDERED_LIST"])
 
+IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_RE = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     result = list()
     for node in old_nodes:
@@ -16,96 +27,60 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         elif delimiter not in node.text:
             result.append(node)
         else:
-            opening_pos = node.text.find(delimiter)
-            if opening_pos != -1:
-                closing_pos = node.text.find(delimiter, opening_pos + len(delimiter))
+            # walk the delimiters left to right instead of recursing on the
+            # remainder, which copied the tail once per pair
+            text = node.text
+            position = 0
+            while True:
+                opening_pos = text.find(delimiter, position)
+                if opening_pos == -1:
+                    break
+                closing_pos = text.find(delimiter, opening_pos + len(delimiter))
                 if closing_pos == -1:
                     raise Exception("No closing delimiter found")
-                
-                before_text = node.text[:opening_pos]
-                inside_text = node.text[opening_pos + len(delimiter):closing_pos]
-                after_text = node.text[closing_pos + len(delimiter):]
-
-                before_node = TextNode(before_text, TextType.TEXT)
-                inside_node = TextNode(inside_text, text_type)
-                after_node = TextNode(after_text, TextType.TEXT)
-
-                result.append(before_node)
-                result.append(inside_node)
-
-                if after_node.text.find(delimiter) != -1:
-                    result.extend(split_nodes_delimiter([after_node], delimiter, text_type))
-                else:
-                    result.append(after_node)
+
+                result.append(TextNode(text[position:opening_pos], TextType.TEXT))
+                result.append(TextNode(text[opening_pos + len(delimiter):closing_pos], text_type))
+                position = closing_pos + len(delimiter)
+
+            result.append(TextNode(text[position:], TextType.TEXT))
     
     return result
 
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = IMAGE_RE.findall(text)
     return matches
 
 def extract_markdown_links(text):
-    matches = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = LINK_RE.findall(text)
     return matches
 
-def split_nodes_image(old_nodes):
+def split_nodes_pattern(old_nodes, pattern, text_type):
     result = list()
     for node in old_nodes:
         if node.text_type is not TextType.TEXT:
             result.append(node)
             continue
-        
-        images = extract_markdown_images(node.text)
-        if not images:
-            result.append(node)
-            continue
-        
-        image_alt, image_link = images[0]
-        split_text = node.text.split(f"![{image_alt}]({image_link})", 1)
-
-        before_text = split_text[0]
-        after_text = split_text[1] if len(split_text) > 1 else ""
 
-        if before_text:
-            result.append(TextNode(before_text, TextType.TEXT))
-
-        result.append(TextNode(image_alt, TextType.IMAGE, image_link))
-
-        if after_text:
-            after_nodes = split_nodes_image([TextNode(after_text, TextType.TEXT)])
-            result.extend(after_nodes)   
-
-    return result
-
-def split_nodes_link(old_nodes):
-    result = list()
+        position = 0
+        for match in pattern.finditer(node.text):
+            if match.start() > position:
+                result.append(TextNode(node.text[position:match.start()], TextType.TEXT))
+            result.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
 
-    for node in old_nodes:
-        if node.text_type is not TextType.TEXT:
+        if position == 0:
             result.append(node)
-            continue
-        
-        links = extract_markdown_links(node.text)
-        if not links:
-            result.append(node)
-            continue
-        
-        alt_text, link = links[0]
-        split_text = node.text.split(f"[{alt_text}]({link})", 1)
-
-        before_text = split_text[0]
-        after_text = split_text[1] if len(split_text) > 1 else ""
+        elif position < len(node.text):
+            result.append(TextNode(node.text[position:], TextType.TEXT))
 
-        if before_text:
-            result.append(TextNode(before_text, TextType.TEXT))
-
-        result.append(TextNode(alt_text, TextType.LINK, link))
+    return result
 
-        if after_text:
-            after_nodes = split_nodes_link([TextNode(after_text, TextType.TEXT)])
-            result.extend(after_nodes)   
+def split_nodes_image(old_nodes):
+    return split_nodes_pattern(old_nodes, IMAGE_RE, TextType.IMAGE)
 
-    return result
+def split_nodes_link(old_nodes):
+    return split_nodes_pattern(old_nodes, LINK_RE, TextType.LINK)
 
 def text_to_textnodes(text):
     text_list = [TextNode(text, TextType.TEXT)]
@@ -145,35 +120,78 @@ def markdown_to_blocks(markdown):
     return result
 
 def is_ordered_list(block):
-    lines = block.split("\n")
+    return classify_ordered_list(block, block.split("\n")) is not None
+
+def classify_heading(block, lines):
+    level = 0
+    for char in block[:7]:
+        if char == "#":
+            level += 1
+        else:
+            break
+    if 1 <= level <= 6 and block[level:level+1] == " ":
+        return level, block[level + 1 :]
+    return None
+
+def classify_code(block, lines):
+    if block.startswith("```") and block.endswith("```"):
+        if len(lines) == 1:
+            # ```inline code``` has no info string, the fences wrap the text directly
+            return "", block[3:-3]
+        # the info string after the opening fence names the language
+        return language_for(lines[0][3:].strip()), block[len(lines[0]) + 1:-3]
+    return None
+
+def classify_quote(block, lines):
+    quote_lines = []
+    for line in lines:
+        if line != ">" and not line.startswith("> "):
+            return None
+        quote_lines.append(line.lstrip(">").strip())
+    return quote_lines
+
+def classify_unordered_list(block, lines):
+    items = []
+    for line in lines:
+        if not line.startswith("- "):
+            return None
+        items.append(line[2:])
+    return items
+
+def classify_ordered_list(block, lines):
+    items = []
     for i, line in enumerate(lines):
         expected_prefix = f"{i+1}. "
         if not line.startswith(expected_prefix):
-            return False
-    return True
+            return None
+        items.append(line[len(expected_prefix):])
+    return items
+
+# keyed by the first character of a block, so a block is only tested
+# against the types that can possibly match it
+BLOCK_CLASSIFIERS = {
+    "#": [(BlockType.HEADING, classify_heading)],
+    "`": [(BlockType.CODE, classify_code)],
+    ">": [(BlockType.QUOTE, classify_quote)],
+    "-": [(BlockType.UNORDERED_LIST, classify_unordered_list)],
+    "1": [(BlockType.ORDERED_LIST, classify_ordered_list)],
+}
+
+def register_block_type(block_type, prefixes, classify, render):
+    for prefix in prefixes:
+        BLOCK_CLASSIFIERS.setdefault(prefix[:1], []).insert(0, (block_type, classify))
+    BLOCK_RENDERERS[block_type] = render
+
+def classify_block(block):
+    lines = block.split("\n")
+    for block_type, classify in BLOCK_CLASSIFIERS.get(block[:1], ()):
+        parsed = classify(block, lines)
+        if parsed is not None:
+            return block_type, parsed
+    return BlockType.PARAGRAPH, lines
 
 def block_to_block_type(block):
-    if block.startswith("#"):
-        count = 0
-        for char in block:
-            if char == "#":
-                count += 1
-            else:
-                break
-        if 1 <= count <= 6 and block[count:count+1] == " ": 
-            return BlockType.HEADING
-        else:
-            return BlockType.PARAGRAPH
-    elif block.startswith("```") and block.endswith("```"):
-        return BlockType.CODE
-    elif all(line.startswith(">") for line in block.split("\n")):
-        return BlockType.QUOTE
-    elif all(line.startswith("- ") for line in block.split("\n")):
-        return BlockType.UNORDERED_LIST
-    elif is_ordered_list(block):
-        return BlockType.ORDERED_LIST
-    else:
-        return BlockType.PARAGRAPH
+    return classify_block(block)[0]
     
 def text_to_children(text):
     textnodes = text_to_textnodes(text)
@@ -191,81 +209,72 @@ def markdown_to_html_node(markdown):
     return ParentNode("div", children, None)
 
 def block_to_html_node(block):
-    block_type = block_to_block_type(block)
-    if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
-    if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
-    if block_type == BlockType.CODE:
-        return code_to_html_node(block)
-    if block_type == BlockType.ORDERED_LIST:
-        return olist_to_html_node(block)
-    if block_type == BlockType.UNORDERED_LIST:
-        return ulist_to_html_node(block)
-    if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
-    raise ValueError("invalid block type")
-
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
+    block_type, parsed = classify_block(block)
+    render = BLOCK_RENDERERS.get(block_type)
+    if render is None:
+        raise ValueError("invalid block type")
+    return render(parsed)
+
+def paragraph_to_html_node(lines):
     paragraph = " ".join(lines)
     children = text_to_children(paragraph)
     return ParentNode("p", children)
 
-def heading_to_html_node(block):
-    level = 0
-    for char in block:
-        if char == "#":
-            level += 1
-        else:
-            break
-    if level + 1 >= len(block):
-        raise ValueError(f"invalid heading level: {level}")
-    text = block[level + 1 :]
+def heading_to_html_node(heading):
+    level, text = heading
     children = text_to_children(text)
     return ParentNode(f"h{level}", children)
 
-def code_to_html_node(block):
-    if not block.startswith("```") or not block.endswith("```"):
-        raise ValueError("invalid code block")
-    text = block[4:-3]
-    raw_text_node = TextNode(text, TextType.TEXT)
-    child = text_node_to_html_node(raw_text_node)
-    code = ParentNode("code", [child])
+def code_to_html_node(code_block):
+    language, text = code_block
+    if not language:
+        raw_text_node = TextNode(text, TextType.TEXT)
+        child = text_node_to_html_node(raw_text_node)
+        code = ParentNode("code", [child])
+        return ParentNode("pre", [code])
+    code = ParentNode("code", highlight_to_nodes(language, text), {"class": f"language-{language}"})
     return ParentNode("pre", [code])
 
 
-def olist_to_html_node(block):
-    items = block.split("\n")
+def olist_to_html_node(items):
     html_items = []
     for item in items:
-        text = item[3:]
-        children = text_to_children(text)
+        children = text_to_children(item)
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
 
-def ulist_to_html_node(block):
-    items = block.split("\n")
+def ulist_to_html_node(items):
     html_items = []
     for item in items:
-        text = item[2:]
-        children = text_to_children(text)
+        children = text_to_children(item)
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
 
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
-    new_lines = []
-    for line in lines:
-        if not line.startswith(">"):
-            raise ValueError("invalid quote block")
-        new_lines.append(line.lstrip(">").strip())
-    content = "<br>".join(new_lines)
-    children = text_to_children(content)
+def quote_to_html_node(lines):
+    content = "\n".join(lines)
+    children = []
+    for child in text_to_children(content):
+        if child.tag is not None or "\n" not in child.value:
+            children.append(child)
+            continue
+        for i, part in enumerate(child.value.split("\n")):
+            if i > 0:
+                children.append(LeafNode("br", ""))
+            if part:
+                children.append(LeafNode(None, part))
     return ParentNode("blockquote", children)
 
+BLOCK_RENDERERS = {
+    BlockType.PARAGRAPH: paragraph_to_html_node,
+    BlockType.HEADING: heading_to_html_node,
+    BlockType.CODE: code_to_html_node,
+    BlockType.QUOTE: quote_to_html_node,
+    BlockType.UNORDERED_LIST: ulist_to_html_node,
+    BlockType.ORDERED_LIST: olist_to_html_node,
+}
+
 def extract_title(markdown):
     lines = markdown.splitlines()
     for line in lines:
@@ -277,28 +286,115 @@ def extract_title(markdown):
                 return heading.strip()
     raise Exception("No valid h1 header")
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    with open(from_path, "r") as file:
-        content = file.read()
-    with open(template_path, "r") as file:
-        template = file.read()
-    html_content = markdown_to_html_node(content).to_html()
-    title = extract_title(content)
-    template_title = template.replace("{{ Title }}", title)
-    template_content = template_title.replace("{{ Content }}", html_content)
-    template_content = template_content.replace('href="/', f'href="{basepath}')
-    template_content = template_content.replace('src="/', f'src="{basepath}')
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w") as file:
-        file.write(template_content)
-
-def generate_page_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    items = os.listdir(dir_path_content)
+def render_page_chunks(content, template, basepath, asset_map = None, image_sizer = None):
+    return render_block_chunks(markdown_to_blocks(content), extract_title(content), template, basepath, asset_map, image_sizer)
+
+def render_block_chunks(blocks, title, template, basepath, asset_map = None, image_sizer = None):
+    # one chunk per block, so only the block being rendered is held as a node tree
+    head, _, tail = template.partition("{{ Content }}")
+    for chunk in _page_pieces(blocks, title, head, tail, image_sizer):
+        chunk = rewrite_asset_urls(chunk, asset_map)
+        chunk = chunk.replace('href="/', f'href="{basepath}')
+        chunk = chunk.replace('src="/', f'src="{basepath}')
+        yield chunk
+
+def _page_pieces(blocks, title, head, tail, image_sizer):
+    # the title is raw markdown text, the same escaping as the <h1> applies
+    title = escape_text(title)
+    yield head.replace("{{ Title }}", title)
+    yield "<div>"
+    for block in blocks:
+        html_node = block_to_html_node(block)
+        if image_sizer is not None:
+            image_sizer.annotate(html_node)
+        yield html_node.to_html()
+    yield "</div>"
+    yield tail.replace("{{ Title }}", title)
+
+class BuildContext:
+    # options shared by every page of one build, threaded through the recursion as one object
+    def __init__(self, minify = False, asset_map = None, image_sizer = None, cache = None, templates = None, graph = None, output = None):
+        self.minify = minify
+        self.asset_map = asset_map
+        self.image_sizer = image_sizer
+        self.cache = cache
+        self.templates = templates
+        self.graph = graph
+        self.output = output
+
+    def with_defaults(self, templates, output):
+        if self.templates is not None and self.output is not None:
+            return self
+        return BuildContext(
+            self.minify, self.asset_map, self.image_sizer, self.cache,
+            templates if self.templates is None else self.templates,
+            self.graph,
+            output if self.output is None else self.output,
+        )
+
+class PageError(Exception):
+    # names the markdown source, the underlying error alone rarely identifies it
+    def __init__(self, path, error):
+        super().__init__(f"{path}: {error}")
+        self.path = path
+
+def generate_page(from_path, template_path, dest_path, basepath, build = None):
+    build = BuildContext() if build is None else build
+    templates = TemplateLoader() if build.templates is None else build.templates
+    output = DirectoryOutput(os.path.dirname(dest_path)) if build.output is None else build.output
+    cache = build.cache
+    graph = build.graph
+    template_path = templates.template_for(from_path, template_path)
+    template, chain = templates.load(template_path)
+    if graph is not None:
+        source_digest = file_digest(from_path)
+        chain_digest = templates.chain_digest(template_path)
+        if graph.is_fresh(dest_path, source_digest, chain_digest):
+            log.debug(f"Skipping up to date page {dest_path}", event="page_fresh", dest=dest_path)
+            log.advance()
+            return
+    log.info(f"Generating page from {from_path} to {dest_path} using {template_path}", event="page", source=from_path, dest=dest_path)
+    try:
+        with MarkdownSource(from_path) as source:
+            if cache is not None:
+                key = cache.page_key(source.digest(), template)
+                cached_path = cache.lookup("pages", key)
+                if cached_path is not None:
+                    try:
+                        output.copy_file(dest_path, cached_path)
+                    except FileNotFoundError:
+                        # evicted by a concurrent gc, render it instead
+                        pass
+                    else:
+                        log.debug(f"Reused cached page for {dest_path}", event="cache_hit", dest=dest_path)
+                        if graph is not None:
+                            graph.record(dest_path, from_path, source_digest, template_path, chain, chain_digest)
+                        log.advance()
+                        return
+            chunks = render_block_chunks(source.blocks(), source.title(), template, basepath, build.asset_map, build.image_sizer)
+            if build.minify:
+                minifier = HTMLMinifier()
+                chunks = minify_chunks(chunks, minifier)
+            written = output.write_chunks(dest_path, chunks)
+    except Exception as error:
+        raise PageError(from_path, error) from error
+    if build.minify:
+        saved = minifier.bytes_in - minifier.bytes_out
+        log.info(f"Minified {dest_path}: saved {saved} bytes in {minifier.seconds:.4f}s", event="minify", dest=dest_path, saved_bytes=saved, seconds=minifier.seconds)
+    if cache is not None:
+        cache.put_file("pages", key, written)
+    if graph is not None:
+        graph.record(dest_path, from_path, source_digest, template_path, chain, chain_digest)
+    log.advance()
+
+def generate_page_recursive(dir_path_content, template_path, dest_dir_path, basepath, build = None):
+    build = BuildContext() if build is None else build
+    build = build.with_defaults(TemplateLoader(content_dir=dir_path_content), DirectoryOutput(dest_dir_path))
+    # sorted so archives list their entries in a stable order
+    items = sorted(os.listdir(dir_path_content))
     for item in items:
         if os.path.isfile(os.path.join(dir_path_content, item)) and item.endswith(".md"):
             html_item = item.replace(".md", ".html")
-            generate_page(os.path.join(dir_path_content, item), template_path, os.path.join(dest_dir_path, html_item), basepath)
+            generate_page(os.path.join(dir_path_content, item), template_path, os.path.join(dest_dir_path, html_item), basepath, build)
         else:
-            os.makedirs(os.path.join(dest_dir_path, item), exist_ok=True)
-            generate_page_recursive(os.path.join(dir_path_content, item), template_path, os.path.join(dest_dir_path, item), basepath)
+            generate_page_recursive(os.path.join(dir_path_content, item), template_path, os.path.join(dest_dir_path, item), basepath, build)
@@ -0,0 +1,140 @@
+import os
+import re
+
+from buildcache import content_hash
+from manifest import file_digest
+
+INCLUDE_RE = re.compile(r"\{\{>\s*([\w./-]+)\s*\}\}")
+
+class TemplateLoader:
+    def __init__(self, templates_dir = "templates", content_dir = "content"):
+        self.templates_dir = templates_dir
+        self.content_dir = content_dir
+        self.compiled = {}
+        self.sections = {}
+
+    def partial_path(self, name):
+        if not name.endswith(".html"):
+            name = f"{name}.html"
+        return os.path.join(self.templates_dir, "partials", name)
+
+    def template_for(self, from_path, default_path):
+        # content/blog/tom/index.md tries templates/blog/tom.html, then templates/blog.html
+        section = os.path.dirname(os.path.relpath(from_path, self.content_dir))
+        if section in self.sections:
+            return self.sections[section] or default_path
+        found = None
+        parts = [] if section in ("", ".") else section.split(os.sep)
+        while parts:
+            candidate = os.path.join(self.templates_dir, *parts) + ".html"
+            if os.path.isfile(candidate):
+                found = candidate
+                break
+            parts.pop()
+        self.sections[section] = found
+        return found or default_path
+
+    def load(self, template_path):
+        if template_path not in self.compiled:
+            self.compiled[template_path] = self._compile(template_path, ())
+        return self.compiled[template_path]
+
+    def chain_digest(self, template_path):
+        text, chain = self.load(template_path)
+        return content_hash(text, *chain)
+
+    def _compile(self, path, stack):
+        if path in stack:
+            raise ValueError(f"Template include cycle: {' -> '.join(stack + (path,))}")
+        with open(path, "r") as file:
+            text = file.read()
+        chain = [path]
+
+        def include(match):
+            partial_path = self.partial_path(match.group(1))
+            if not os.path.isfile(partial_path):
+                raise ValueError(f"Missing partial {match.group(1)!r} included from {path}")
+            partial_text, partial_chain = self._compile(partial_path, stack + (path,))
+            for dependency in partial_chain:
+                if dependency not in chain:
+                    chain.append(dependency)
+            return partial_text
+
+        return INCLUDE_RE.sub(include, text), chain
+
+class DependencyGraph:
+    def __init__(self, manifest, context = "", incremental = True):
+        self.manifest = manifest
+        self.context = context
+        # full builds rewrite every page but still record them, so a later
+        # incremental build never trusts an entry describing an older docs/
+        self.incremental = incremental
+        self.seen = set()
+        self.fresh = 0
+        self.recorded_templates = set()
+
+    def is_fresh(self, dest_path, source_digest, chain_digest):
+        self.seen.add(dest_path)
+        if not self.incremental:
+            return False
+        entry = self.manifest.get("pages", dest_path)
+        fresh = (
+            entry is not None
+            and entry["source_digest"] == source_digest
+            and entry["chain_digest"] == chain_digest
+            and entry["context"] == self.context
+            and os.path.exists(dest_path)
+        )
+        if fresh:
+            self.fresh += 1
+        return fresh
+
+    def record(self, dest_path, source_path, source_digest, template_path, chain, chain_digest):
+        self.seen.add(dest_path)
+        self.manifest.set("pages", dest_path, {
+            "source": source_path,
+            "source_digest": source_digest,
+            "template": template_path,
+            "chain": list(chain),
+            "chain_digest": chain_digest,
+            "context": self.context,
+        })
+        # a partial first used by this build has no digest yet; without one its next edit goes unreported
+        for path in chain:
+            if path not in self.recorded_templates:
+                self.recorded_templates.add(path)
+                self.manifest.set("templates", path, file_digest(path) if os.path.isfile(path) else None)
+
+    def changed_templates(self):
+        # templates and partials used by the last build whose contents differ now
+        pages = self.manifest.entries.get("pages", {})
+        paths = sorted({path for entry in pages.values() for path in entry["chain"]})
+        changed = []
+        for path in paths:
+            digest = file_digest(path) if os.path.isfile(path) else None
+            previous = self.manifest.get("templates", path)
+            if previous is not None and previous != digest:
+                changed.append(path)
+            self.manifest.set("templates", path, digest)
+        return changed
+
+    def dependents(self, template_path):
+        pages = self.manifest.entries.get("pages", {})
+        return sorted(dest for dest, entry in pages.items() if template_path in entry["chain"])
+
+    def prune(self):
+        # pages whose markdown source disappeared since the last build
+        pages = self.manifest.entries.get("pages", {})
+        removed = []
+        for dest_path in sorted(pages):
+            if dest_path not in self.seen:
+                # --gzip leaves a compressed sibling next to the page
+                for path in (dest_path, f"{dest_path}.gz"):
+                    if os.path.exists(path):
+                        os.remove(path)
+                gzip_entries = self.manifest.entries.get("gzip", {})
+                for key in [key for key in gzip_entries if key.rsplit(":", 1)[0] == dest_path]:
+                    del gzip_entries[key]
+                del pages[dest_path]
+                removed.append(dest_path)
+        return removed
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import time
+import unittest
+
+from buildcache import BuildCache, atomic_write, cache_from_env, CACHE_ENV_VAR, TEMP_GRACE_SECONDS, TEMP_PREFIX
+
+
+class TestBuildCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = BuildCache(os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as file:
+            file.write(data)
+        return path
+
+    def test_page_roundtrip(self):
+        key = self.cache.page_key("# Title", "<html>{{ Content }}</html>")
+        dest = os.path.join(self.tmp.name, "out.html")
+        self.assertFalse(self.cache.get_file("pages", key, dest))
+        self.cache.put_file("pages", key, self.write("page.html", "<h1>Title</h1>"))
+        self.assertTrue(self.cache.get_file("pages", key, dest))
+        with open(dest) as file:
+            self.assertEqual(file.read(), "<h1>Title</h1>")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_depends_on_template_and_context(self):
+        key = self.cache.page_key("# Title", "a")
+        self.assertNotEqual(key, self.cache.page_key("# Title", "b"))
+        self.cache.set_context("/blog/")
+        self.assertNotEqual(key, self.cache.page_key("# Title", "a"))
+
+    def test_json_roundtrip(self):
+        self.cache.put_json("images", "abcd", [640, 480])
+        self.assertEqual(self.cache.get_json("images", "abcd"), [640, 480])
+        self.assertIsNone(self.cache.get_json("images", "ffff"))
+
+    def test_atomic_write_leaves_no_temp_files(self):
+        path = os.path.join(self.tmp.name, "sub", "entry")
+        atomic_write(path, b"one")
+        atomic_write(path, b"two")
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["entry"])
+
+    def test_gc_evicts_least_recently_used(self):
+        for i, key in enumerate(["aa01", "bb02", "cc03"]):
+            self.cache.put_json("images", key, "x" * 100)
+            old = time.time() - 100 + i
+            os.utime(self.cache.path_for("images", key), (old, old))
+        self.cache.get_json("images", "aa01")
+        removed, freed = self.cache.gc(max_bytes=250)
+        self.assertEqual(removed, 1)
+        self.assertIsNone(self.cache.get_json("images", "bb02"))
+        self.assertIsNotNone(self.cache.get_json("images", "aa01"))
+
+    def test_gc_skips_in_flight_temp_files(self):
+        directory = os.path.join(self.cache.root, "pages", "ab")
+        os.makedirs(directory)
+        in_flight = os.path.join(directory, TEMP_PREFIX + "writing")
+        abandoned = os.path.join(directory, TEMP_PREFIX + "crashed")
+        for path in (in_flight, abandoned):
+            with open(path, "wb") as file:
+                file.write(b"x" * 100)
+        old = time.time() - TEMP_GRACE_SECONDS - 10
+        os.utime(abandoned, (old, old))
+        removed, freed = self.cache.gc(max_bytes=0)
+        self.assertEqual(removed, 1)
+        self.assertTrue(os.path.exists(in_flight))
+        self.assertFalse(os.path.exists(abandoned))
+
+    def test_cache_from_env(self):
+        os.environ.pop(CACHE_ENV_VAR, None)
+        self.assertIsNone(cache_from_env())
+        os.environ[CACHE_ENV_VAR] = self.tmp.name
+        try:
+            self.assertEqual(cache_from_env().root, self.tmp.name)
+        finally:
+            del os.environ[CACHE_ENV_VAR]
+
+
+if __name__ == "__main__":
+    unittest.main()
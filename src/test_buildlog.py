@@ -0,0 +1,56 @@
+import io
+import json
+import unittest
+
+from buildlog import BuildLogger
+
+
+class TestBuildLogger(unittest.TestCase):
+    def test_quiet_by_default(self):
+        stream = io.StringIO()
+        logger = BuildLogger(stream=stream)
+        logger.info("Copying file: a.png")
+        logger.summary("Built 1 pages")
+        logger.close()
+        self.assertEqual(stream.getvalue(), "Built 1 pages\n")
+
+    def test_errors_flush_immediately(self):
+        stream = io.StringIO()
+        logger = BuildLogger(stream=stream)
+        logger.error("broken page")
+        self.assertEqual(stream.getvalue(), "ERROR: broken page\n")
+
+    def test_lines_are_batched(self):
+        stream = io.StringIO()
+        logger = BuildLogger("info", stream=stream, batch_size=3)
+        logger.info("one")
+        logger.info("two")
+        self.assertEqual(stream.getvalue(), "")
+        logger.info("three")
+        self.assertEqual(stream.getvalue(), "one\ntwo\nthree\n")
+
+    def test_json_events(self):
+        json_stream = io.StringIO()
+        logger = BuildLogger(stream=io.StringIO(), json_stream=json_stream)
+        logger.info("Generating page", event="page", dest="docs/index.html")
+        logger.summary("done", pages=1)
+        logger.close()
+        events = [json.loads(line) for line in json_stream.getvalue().splitlines()]
+        self.assertEqual([event["level"] for event in events], ["info", "summary"])
+        self.assertEqual(events[0]["dest"], "docs/index.html")
+        self.assertEqual(events[1]["pages"], 1)
+
+    def test_progress_bar(self):
+        stream = io.StringIO()
+        logger = BuildLogger(stream=stream, progress=True)
+        logger.start_progress(2)
+        logger.advance()
+        logger.advance()
+        logger.finish_progress()
+        self.assertIn("2/2 pages", stream.getvalue())
+        self.assertIn("ETA", stream.getvalue())
+        self.assertTrue(stream.getvalue().endswith("\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import list_compressible_files, precompress_directory
+from manifest import Manifest
+from buildcache import BuildCache
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        with open(os.path.join(self.dir, "index.html"), "w") as file:
+            file.write("<p>hello</p>" * 100)
+        with open(os.path.join(self.dir, "image.png"), "wb") as file:
+            file.write(b"\x89PNG")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_only_text_assets(self):
+        files = list_compressible_files(self.dir)
+        self.assertEqual(files, [os.path.join(self.dir, "index.html")])
+
+    def test_precompress_roundtrip(self):
+        stats = precompress_directory(self.dir, Manifest(None))
+        self.assertEqual(stats["files"], 1)
+        self.assertLess(stats["ratio"], 1.0)
+        with gzip.open(os.path.join(self.dir, "index.html.gz"), "rt") as file:
+            self.assertEqual(file.read(), "<p>hello</p>" * 100)
+
+    def test_skips_up_to_date(self):
+        manifest = Manifest(None)
+        precompress_directory(self.dir, manifest)
+        stats = precompress_directory(self.dir, manifest)
+        self.assertEqual(stats["files"], 0)
+        self.assertEqual(stats["skipped"], 1)
+
+    def test_restores_from_cache(self):
+        manifest = Manifest(None)
+        cache = BuildCache(os.path.join(self.dir, "cache"))
+        precompress_directory(self.dir, manifest, cache=cache)
+        os.remove(os.path.join(self.dir, "index.html.gz"))
+        stats = precompress_directory(self.dir, manifest, cache=cache)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "index.html.gz")))
+
+    def test_cached_blobs_evicted_by_gc(self):
+        manifest = Manifest(None)
+        cache = BuildCache(os.path.join(self.dir, "cache"))
+        precompress_directory(self.dir, manifest, cache=cache)
+        self.assertEqual(cache.gc(max_bytes=0)[0], 1)
+        os.remove(os.path.join(self.dir, "index.html.gz"))
+        stats = precompress_directory(self.dir, manifest, cache=cache)
+        self.assertEqual(stats["files"], 1)
+
+    def test_recompresses_changed(self):
+        manifest = Manifest(None)
+        precompress_directory(self.dir, manifest)
+        with open(os.path.join(self.dir, "index.html"), "w") as file:
+            file.write("<p>changed</p>")
+        stats = precompress_directory(self.dir, manifest)
+        self.assertEqual(stats["files"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
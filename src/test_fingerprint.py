@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from fingerprint import fingerprint_name, cached_file_digest, rewrite_asset_urls
+from manifest import Manifest, file_digest
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("index.css", "3f9a2cdeadbeef"), "index.3f9a2c.css")
+        self.assertEqual(fingerprint_name("LICENSE", "3f9a2cdeadbeef"), "LICENSE.3f9a2c")
+
+    def test_rewrite_asset_urls(self):
+        asset_map = {"/index.css": "/index.3f9a2c.css", "/images/tom.png": "/images/tom.a1b2c3.png"}
+        html = '<link href="/index.css" /><img src="/images/tom.png?v=1" alt="x"><a href="/blog/tom">t</a>'
+        self.assertEqual(
+            rewrite_asset_urls(html, asset_map),
+            '<link href="/index.3f9a2c.css" /><img src="/images/tom.a1b2c3.png?v=1" alt="x"><a href="/blog/tom">t</a>',
+        )
+
+    def test_rewrite_without_map(self):
+        html = '<link href="/index.css" />'
+        self.assertEqual(rewrite_asset_urls(html, None), html)
+
+    def test_digest_reused_from_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.css")
+            with open(path, "w") as file:
+                file.write("body {}")
+            manifest = Manifest(None)
+            digest = cached_file_digest(path, manifest)
+            self.assertEqual(digest, file_digest(path))
+            manifest.entries["assets"][path]["digest"] = "cached"
+            self.assertEqual(cached_file_digest(path, manifest), "cached")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+import highlight
+from highlight import tokenize, highlight_to_nodes, language_for
+from split_nodes import markdown_to_html_node
+
+
+class FakeStore:
+    def __init__(self):
+        self.entries = {}
+
+    def get_json(self, namespace, key):
+        return self.entries.get((namespace, key))
+
+    def put_json(self, namespace, key, value):
+        self.entries[(namespace, key)] = value
+
+
+class TestHighlight(unittest.TestCase):
+    def tearDown(self):
+        highlight.configure(None)
+        highlight.memo.clear()
+
+    def test_language_aliases(self):
+        self.assertEqual(language_for("py"), "python")
+        self.assertEqual(language_for(" JS title=app.js"), "javascript")
+        self.assertEqual(language_for(""), "")
+
+    def test_tokenize_python(self):
+        tokens = tokenize("python", 'def f():  # note\n    return "x"')
+        self.assertEqual(
+            tokens,
+            [["keyword", "def"], [None, " f():  "], ["comment", "# note"], [None, "\n    "], ["keyword", "return"], [None, " "], ["string", '"x"']],
+        )
+
+    def test_tokens_roundtrip_source(self):
+        code = "const a = `b ${c}`; // done\n/* multi\nline */ let x = 0x1F;"
+        self.assertEqual("".join(text for kind, text in tokenize("javascript", code)), code)
+
+    def test_unknown_language_is_plain(self):
+        nodes = highlight_to_nodes("elflang", "func main(){}")
+        self.assertEqual([node.to_html() for node in nodes], ["func main(){}"])
+
+    def test_memoized_in_store(self):
+        store = FakeStore()
+        highlight.configure(store)
+        highlight_to_nodes("go", "package main")
+        self.assertEqual(len(store.entries), 1)
+        # a new build reconfigures and starts with an empty memo
+        highlight.configure(store)
+        self.assertEqual(highlight.memo, {})
+        key = next(iter(store.entries))
+        store.entries[key] = [["keyword", "cached"]]
+        self.assertEqual(highlight_to_nodes("go", "package main")[0].value, "cached")
+
+    def test_code_block_info_string(self):
+        md = "```python\nx = 1 < 2\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><pre><code class="language-python">x = <span class="tok-number">1</span> &lt; '
+            '<span class="tok-number">2</span>\n</code></pre></div>',
+        )
+
+    def test_single_line_code_block(self):
+        self.assertEqual(
+            markdown_to_html_node("```inline code```").to_html(),
+            "<div><pre><code>inline code</code></pre></div>",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -38,4 +38,24 @@ class TestHTMLnode(unittest.TestCase):
         self.assertEqual(
             parent_node.to_html(),
             "<div><span><b>grandchild</b></span></div>",
-        )
\ No newline at end of file
+        )
+
+    def test_leaf_escapes_value(self):
+        node = LeafNode("code", "if a < b && c > d:")
+        self.assertEqual(node.to_html(), "<code>if a &lt; b &amp;&amp; c &gt; d:</code>")
+
+    def test_raw_text_escaped(self):
+        node = LeafNode(None, "< Back Home")
+        self.assertEqual(node.to_html(), "&lt; Back Home")
+
+    def test_props_escaped(self):
+        node = LeafNode("a", "link", {"href": '/search?q=a&b="c"'})
+        self.assertEqual(node.to_html(), '<a href="/search?q=a&amp;b=&quot;c&quot;">link</a>')
+
+    def test_plain_text_unchanged(self):
+        text = "Nothing to escape here"
+        self.assertIs(LeafNode(None, text).to_html(), text)
+
+    def test_void_element(self):
+        node = LeafNode("img", "", {"src": "/a.png", "alt": "a"})
+        self.assertEqual(node.to_html(), '<img src="/a.png" alt="a">')
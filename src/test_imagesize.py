@@ -0,0 +1,98 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from imagesize import read_image_size, ImageSizer
+from htmlnode import LeafNode, ParentNode
+from manifest import Manifest
+
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+def jpeg_header(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof + b"\xff\xd9"
+
+def gif_header(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 20
+
+def webp_header(chunk, payload):
+    return b"RIFF" + struct.pack("<I", 100) + b"WEBP" + chunk + struct.pack("<I", 10) + payload
+
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def test_png(self):
+        self.assertEqual(read_image_size(self.write("a.png", png_header(640, 480))), (640, 480))
+
+    def test_jpeg(self):
+        self.assertEqual(read_image_size(self.write("a.jpg", jpeg_header(800, 600))), (800, 600))
+
+    def test_gif(self):
+        self.assertEqual(read_image_size(self.write("a.gif", gif_header(16, 32))), (16, 32))
+
+    def test_webp_lossy(self):
+        payload = b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 300, 200)
+        self.assertEqual(read_image_size(self.write("a.webp", webp_header(b"VP8 ", payload))), (300, 200))
+
+    def test_webp_lossless(self):
+        bits = (300 - 1) | ((200 - 1) << 14)
+        payload = b"\x2f" + bits.to_bytes(4, "little")
+        self.assertEqual(read_image_size(self.write("a.webp", webp_header(b"VP8L", payload))), (300, 200))
+
+    def test_webp_extended(self):
+        payload = b"\x00" * 4 + (299).to_bytes(3, "little") + (199).to_bytes(3, "little")
+        self.assertEqual(read_image_size(self.write("a.webp", webp_header(b"VP8X", payload))), (300, 200))
+
+    def test_unknown_format(self):
+        self.assertIsNone(read_image_size(self.write("a.txt", b"not an image at all")))
+
+    def test_truncated_headers(self):
+        truncated = {
+            "png": png_header(640, 480)[:20],
+            "gif": gif_header(16, 32)[:8],
+            "webp": webp_header(b"VP8X", b"\x00" * 6),
+            "jpeg_fill": b"\xff\xd8\xff\xff",
+            "jpeg_sof": jpeg_header(800, 600)[:25],
+            "jpeg_length": b"\xff\xd8\xff\xe0\x00\x01",
+        }
+        for name, data in truncated.items():
+            with self.subTest(format=name):
+                self.assertIsNone(read_image_size(self.write(name, data)))
+
+    def test_annotate(self):
+        self.write("a.png", png_header(64, 48))
+        manifest = Manifest(None)
+        sizer = ImageSizer(self.tmp.name, manifest)
+        node = ParentNode("p", [LeafNode("img", "", {"src": "/a.png", "alt": "a"})])
+        sizer.annotate(node)
+        self.assertEqual(
+            node.to_html(),
+            '<p><img src="/a.png" alt="a" width="64" height="48" loading="lazy" decoding="async"></p>',
+        )
+        self.assertEqual(list(manifest.entries["image_sizes"].values()), [[64, 48]])
+
+    def test_annotate_remote_image(self):
+        sizer = ImageSizer(self.tmp.name)
+        node = LeafNode("img", "", {"src": "https://example.com/a.png", "alt": "a"})
+        sizer.annotate(node)
+        self.assertNotIn("width", node.props)
+        self.assertEqual(node.props["loading"], "lazy")
+
+
+if __name__ == "__main__":
+    unittest.main()
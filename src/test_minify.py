@@ -0,0 +1,54 @@
+import time
+import unittest
+
+from minify import HTMLMinifier, minify_chunks
+
+
+def minify(html):
+    return "".join(minify_chunks([html]))
+
+
+class TestMinify(unittest.TestCase):
+    def test_drops_indentation(self):
+        html = "<html>\n  <head>\n    <title>Hi</title>\n  </head>\n</html>"
+        self.assertEqual(minify(html), "<html><head><title>Hi</title></head></html>")
+
+    def test_collapses_inline_whitespace(self):
+        self.assertEqual(minify("<p>a   b\n  c <b>d</b> e</p>"), "<p>a b c <b>d</b> e</p>")
+
+    def test_keeps_space_between_inline_tags(self):
+        self.assertEqual(minify("<p><b>a</b>\n<i>b</i></p>"), "<p><b>a</b> <i>b</i></p>")
+        self.assertEqual(minify("<ul>\n  <li><a href=\"/\">x</a></li>\n</ul>"), "<ul><li><a href=\"/\">x</a></li></ul>")
+
+    def test_preserves_pre(self):
+        html = "<div>\n  <pre><code>def f():\n    return  1\n</code></pre>\n</div>"
+        self.assertEqual(minify(html), "<div><pre><code>def f():\n    return  1\n</code></pre></div>")
+
+    def test_preserves_inline_code(self):
+        self.assertEqual(minify("<p>x  <code>a   b</code>  y</p>"), "<p>x <code>a   b</code> y</p>")
+
+    def test_chunk_boundaries(self):
+        html = "<div>\n  <pre>a\n   b</pre>\n  <p>one   two</p>\n</div>"
+        expected = minify(html)
+        for size in range(1, 10):
+            chunks = [html[i:i + size] for i in range(0, len(html), size)]
+            self.assertEqual("".join(minify_chunks(chunks)), expected)
+
+    def test_counts_bytes(self):
+        minifier = HTMLMinifier()
+        "".join(minify_chunks(["<p>\n  a  </p>"], minifier))
+        self.assertEqual(minifier.bytes_in, 13)
+        self.assertEqual(minifier.bytes_out, 10)
+
+    def test_times_only_minification(self):
+        def slow_chunks():
+            time.sleep(0.05)
+            yield "<p>a</p>"
+
+        minifier = HTMLMinifier()
+        "".join(minify_chunks(slow_chunks(), minifier))
+        self.assertLess(minifier.seconds, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import tarfile
+import tempfile
+import time
+import unittest
+import zipfile
+
+from output import ArchiveOutput, DirectoryOutput
+
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "docs")
+        self.asset = os.path.join(self.tmp.name, "index.css")
+        with open(self.asset, "w") as file:
+            file.write("body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, archive_path):
+        output = ArchiveOutput(self.root, archive_path)
+        output.copy_file(os.path.join(self.root, "index.css"), self.asset)
+        output.write_chunks(os.path.join(self.root, "blog", "index.html"), ["<p>", "hi", "</p>"])
+        output.close()
+        with open(archive_path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+
+    def test_directory_output(self):
+        output = DirectoryOutput(self.root)
+        path = os.path.join(self.root, "blog", "index.html")
+        self.assertEqual(output.write_chunks(path, ["<p>", "hi", "</p>"]), path)
+        with open(path) as file:
+            self.assertEqual(file.read(), "<p>hi</p>")
+
+    def test_tar_entries(self):
+        archive = os.path.join(self.tmp.name, "site.tar.gz")
+        self.build(archive)
+        with tarfile.open(archive) as tar:
+            self.assertEqual(tar.getnames(), ["index.css", "blog/index.html"])
+            self.assertEqual(tar.extractfile("blog/index.html").read(), b"<p>hi</p>")
+            self.assertEqual({member.mtime for member in tar.getmembers()}, {0})
+
+    def test_zip_entries(self):
+        archive = os.path.join(self.tmp.name, "site.zip")
+        self.build(archive)
+        with zipfile.ZipFile(archive) as zip_file:
+            self.assertEqual(zip_file.namelist(), ["index.css", "blog/index.html"])
+            self.assertEqual(zip_file.read("index.css"), b"body {}")
+
+    def test_archives_are_reproducible(self):
+        for name in ("site.tar", "site.tar.gz", "site.zip"):
+            with self.subTest(archive=name):
+                archive = os.path.join(self.tmp.name, name)
+                first = self.build(archive)
+                later = time.time() + 60
+                os.utime(self.asset, (later, later))
+                self.assertEqual(self.build(archive), first)
+
+    def test_duplicate_entry(self):
+        output = ArchiveOutput(self.root, os.path.join(self.tmp.name, "site.tar"))
+        output.write_bytes(os.path.join(self.root, "a"), b"1")
+        with self.assertRaises(ValueError):
+            output.write_bytes(os.path.join(self.root, "a"), b"2")
+        output.close()
+
+    def test_unsupported_archive(self):
+        with self.assertRaises(ValueError):
+            ArchiveOutput(self.root, os.path.join(self.tmp.name, "site.rar"))
+
+
+if __name__ == "__main__":
+    unittest.main()
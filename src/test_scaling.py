@@ -0,0 +1,145 @@
+import gc
+import math
+import os
+import statistics
+import sys
+import time
+import unittest
+
+from split_nodes import markdown_to_blocks, classify_block, block_to_html_node
+from minify import minify_chunks
+
+# each generator returns markdown whose size grows linearly with n
+ADVERSARIAL_INPUTS = {
+    "unmatched_brackets": lambda n: "[" * n,
+    "unmatched_parens": lambda n: "(" * n,
+    "unclosed_links": lambda n: "[a](" * n,
+    "unclosed_images": lambda n: "![a" * n,
+    "bracket_runs": lambda n: ("[" + "x" * 8) * n,
+    "italic_pairs": lambda n: "_a_ " * n,
+    "bold_pairs": lambda n: "**b** " * n,
+    "code_pairs": lambda n: "`c` " * n,
+    "links": lambda n: "[a](/b) " * n,
+    "images": lambda n: "![a](/b.png) " * n,
+    "huge_paragraph": lambda n: "\n".join("word " * 8 for _ in range(n)),
+    "many_blocks": lambda n: "para _x_\n\n" * n,
+    "long_list": lambda n: "- item **x**\n" * n,
+    "long_ordered_list": lambda n: "".join(f"{i + 1}. item\n" for i in range(n)),
+    "long_quote": lambda n: "> quoted `line`\n" * n,
+    "huge_code_block": lambda n: "```\n" + "code line\n" * n + "```",
+    "whitespace_run": lambda n: "```\n" + " " * (n * 8) + "x\n```\n\nafter",
+}
+
+SIZES = (2000, 4000, 8000, 16000)
+REPEATS = 3
+FITS = 3
+# timings are too noisy for the default run, so they only run on request
+TIMING_ENV_VAR = "SSG_SCALING_TESTS"
+# a linear stage fits a log-log slope of ~1.0, quadratic ~2.0; leave room for timer noise
+MAX_SLOPE = 1.4
+# the default run compares two sizes 8x apart: linear grows ~8x, quadratic ~64x
+QUICK_SIZES = (500, 4000)
+MAX_QUICK_RATIO = 24
+
+def run_stages(markdown):
+    # a cyclic gc pause landing in one sample skews the whole fit
+    gc.disable()
+    try:
+        return _run_stages(markdown)
+    finally:
+        gc.enable()
+
+def _run_stages(markdown):
+    timings = {}
+    # cpu time of this process only, so other jobs on a busy machine do not count
+    start = time.process_time()
+    blocks = markdown_to_blocks(markdown)
+    timings["blocks"] = time.process_time() - start
+
+    start = time.process_time()
+    for block in blocks:
+        classify_block(block)
+    timings["classify"] = time.process_time() - start
+
+    start = time.process_time()
+    nodes = [block_to_html_node(block) for block in blocks]
+    timings["inline"] = time.process_time() - start
+
+    start = time.process_time()
+    html = [node.to_html() for node in nodes]
+    timings["to_html"] = time.process_time() - start
+
+    start = time.process_time()
+    for chunk in minify_chunks(html):
+        pass
+    timings["minify"] = time.process_time() - start
+    return timings
+
+def fit_slope(sizes, times):
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(elapsed, 1e-7)) for elapsed in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return numerator / denominator
+
+def measure(generator, sizes = SIZES):
+    per_stage = {}
+    for size in sizes:
+        markdown = generator(size)
+        best = None
+        for _ in range(REPEATS):
+            timings = run_stages(markdown)
+            best = timings if best is None else {stage: min(best[stage], timings[stage]) for stage in timings}
+        for stage, elapsed in best.items():
+            per_stage.setdefault(stage, []).append(elapsed)
+    return per_stage
+
+
+class TestScaling(unittest.TestCase):
+    def test_fit_slope(self):
+        self.assertAlmostEqual(fit_slope([1, 2, 4], [1, 2, 4]), 1.0)
+        self.assertAlmostEqual(fit_slope([1, 2, 4], [1, 4, 16]), 2.0)
+
+    def test_no_recursion_error(self):
+        # well past the default recursion limit in a single text node
+        count = sys.getrecursionlimit() * 4
+        for name in ("italic_pairs", "bold_pairs", "code_pairs", "links", "images"):
+            with self.subTest(input=name):
+                markdown = ADVERSARIAL_INPUTS[name](count)
+                for block in markdown_to_blocks(markdown):
+                    block_to_html_node(block).to_html()
+
+    def test_stages_scale_roughly_linearly(self):
+        # cheap enough for every run; the fitted slopes below are the precise check
+        for name, generator in ADVERSARIAL_INPUTS.items():
+            for stage, (small, large) in measure(generator, QUICK_SIZES).items():
+                if large < 0.001:
+                    continue
+                ratio = large / max(small, 1e-7)
+                with self.subTest(input=name, stage=stage):
+                    self.assertLessEqual(
+                        ratio, MAX_QUICK_RATIO,
+                        f"{stage} grew {ratio:.1f}x for 8x input on {name}: {small * 1000:.2f}ms -> {large * 1000:.2f}ms",
+                    )
+
+    @unittest.skipUnless(os.environ.get(TIMING_ENV_VAR), f"set {TIMING_ENV_VAR}=1 to run timing tests")
+    def test_stages_scale_linearly(self):
+        for name, generator in ADVERSARIAL_INPUTS.items():
+            fits = [measure(generator) for _ in range(FITS)]
+            for stage in fits[0]:
+                times = [min(fit[stage][i] for fit in fits) for i in range(len(SIZES))]
+                # stages too fast to time reliably cannot hide super-linear growth
+                if times[-1] < 0.002:
+                    continue
+                slope = statistics.median(fit_slope(SIZES, fit[stage]) for fit in fits)
+                with self.subTest(input=name, stage=stage):
+                    self.assertLessEqual(
+                        slope, MAX_SLOPE,
+                        f"{stage} grows as n^{slope:.2f} on {name}: {[f'{t * 1000:.2f}ms' for t in times]}",
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
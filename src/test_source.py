@@ -0,0 +1,92 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from source import MarkdownSource
+from split_nodes import extract_title, generate_page, generate_page_recursive, markdown_to_blocks, markdown_to_html_node, render_block_chunks, render_page_chunks, BuildContext, PageError
+
+
+class TestMarkdownSource(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data):
+        path = os.path.join(self.tmp.name, "page.md")
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def test_blocks_match_markdown_to_blocks(self):
+        markdown = "# Title\n\n\n\nSome **bold** text\nnext line\n\n- a\n- b\n\n```\ncode\n\nmore\n```\n\n   \n\n> quote ü\n"
+        with MarkdownSource(self.write(markdown.encode("utf-8"))) as source:
+            self.assertEqual(list(source.blocks()), markdown_to_blocks(markdown))
+
+    def test_crlf_line_endings(self):
+        with MarkdownSource(self.write(b"# Title\r\n\r\nline one\r\nline two\r\n")) as source:
+            self.assertEqual(list(source.blocks()), ["# Title", "line one\nline two"])
+            self.assertEqual(source.title(), "Title")
+
+    def test_title_matches_extract_title(self):
+        markdown = "intro\n## Sub\n#  Héllo world  \n\n# Second\n"
+        with MarkdownSource(self.write(markdown.encode("utf-8"))) as source:
+            self.assertEqual(source.title(), extract_title(markdown))
+
+    def test_missing_title(self):
+        with MarkdownSource(self.write(b"## Only a subheading\n\ntext")) as source:
+            with self.assertRaises(Exception):
+                source.title()
+
+    def test_empty_file(self):
+        with MarkdownSource(self.write(b"")) as source:
+            self.assertEqual(list(source.blocks()), [])
+            self.assertEqual(source.digest(), hashlib.sha256(b"").hexdigest())
+            with self.assertRaises(Exception):
+                source.title()
+
+    def test_digest(self):
+        with MarkdownSource(self.write(b"# Title")) as source:
+            self.assertEqual(source.digest(), hashlib.sha256(b"# Title").hexdigest())
+
+    def test_block_chunks_match_whole_page(self):
+        markdown = "# Title\n\nA [link](/blog) and ![img](/images/a.png)\n\n- one\n- two"
+        template = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+        with MarkdownSource(self.write(markdown.encode("utf-8"))) as source:
+            chunks = list(render_block_chunks(source.blocks(), source.title(), template, "/base/"))
+        self.assertEqual("".join(chunks), "".join(render_page_chunks(markdown, template, "/base/")))
+        self.assertIn(markdown_to_html_node(markdown).to_html().replace('="/', '="/base/'), "".join(chunks))
+
+    def test_title_escaped_in_template(self):
+        chunks = render_page_chunks("# Tom & <Jerry>", "<title>{{ Title }}</title>{{ Content }}", "/")
+        self.assertEqual("".join(chunks), "<title>Tom &amp; &lt;Jerry&gt;</title><div><h1>Tom &amp; &lt;Jerry&gt;</h1></div>")
+
+    def test_page_error_names_source(self):
+        path = self.write(b"# Title\n\nan **unclosed delimiter")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as file:
+            file.write("{{ Content }}")
+        with self.assertRaises(PageError) as raised:
+            generate_page(path, template, os.path.join(self.tmp.name, "out", "page.html"), "/")
+        self.assertEqual(raised.exception.path, path)
+        self.assertIn(path, str(raised.exception))
+
+    def test_recursive_build_context(self):
+        content = os.path.join(self.tmp.name, "content")
+        os.makedirs(os.path.join(content, "blog"))
+        for path in (os.path.join(content, "index.md"), os.path.join(content, "blog", "post.md")):
+            with open(path, "w") as file:
+                file.write("# Title\n\n<p>\n  text</p>")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as file:
+            file.write("<main>\n  {{ Content }}\n</main>")
+        docs = os.path.join(self.tmp.name, "docs")
+        generate_page_recursive(content, template, docs, "/", BuildContext(minify=True))
+        with open(os.path.join(docs, "blog", "post.html")) as file:
+            self.assertEqual(file.read(), "<main><div><h1>Title</h1><p>&lt;p&gt; text&lt;/p&gt;</p></div></main>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,10 @@ from textnode import TextNode, TextType
 from split_nodes import (
     split_nodes_delimiter, extract_markdown_images, extract_markdown_links, 
     split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks,
-    block_to_block_type,markdown_to_html_node, extract_title, BlockType
+    block_to_block_type,markdown_to_html_node, extract_title, BlockType,
+    classify_block, register_block_type, BLOCK_CLASSIFIERS, BLOCK_RENDERERS
 )
+from htmlnode import ParentNode, LeafNode
 
 class TestSplitNodes(unittest.TestCase):
     def test_split_nodes_delimiter_simple(self):
@@ -288,6 +290,36 @@ And yet another
         assert block_to_block_type("This has a # in the middle") == BlockType.PARAGRAPH
         assert block_to_block_type("This has\n> a quote line\nbut isn't entirely a quote") == BlockType.PARAGRAPH
     
+    def test_classify_block_parsed_pieces(self):
+        self.assertEqual(classify_block("### Heading 3"), (BlockType.HEADING, (3, "Heading 3")))
+        self.assertEqual(classify_block("- a\n- b"), (BlockType.UNORDERED_LIST, ["a", "b"]))
+        self.assertEqual(classify_block("> a\n>\n> b"), (BlockType.QUOTE, ["a", "", "b"]))
+        self.assertEqual(classify_block("1. a\n2. b"), (BlockType.ORDERED_LIST, ["a", "b"]))
+        self.assertEqual(classify_block("`not code`"), (BlockType.PARAGRAPH, ["`not code`"]))
+
+    def test_ordered_list_double_digits(self):
+        md = "\n".join(f"{i}. item {i}" for i in range(1, 11))
+        html = markdown_to_html_node(md).to_html()
+        self.assertIn("<li>item 10</li>", html)
+
+    def test_register_block_type(self):
+        def classify_admonition(block, lines):
+            if lines[0].startswith("!!! "):
+                return lines[0][4:], lines[1:]
+            return None
+
+        def admonition_to_html_node(parsed):
+            kind, lines = parsed
+            return ParentNode("div", [LeafNode(None, " ".join(lines))], {"class": kind})
+
+        register_block_type("ADMONITION", ["!!!"], classify_admonition, admonition_to_html_node)
+        try:
+            html = markdown_to_html_node("!!! note\nRead this\n\n!not an admonition").to_html()
+            self.assertEqual(html, '<div><div class="note">Read this</div><p>!not an admonition</p></div>')
+        finally:
+            BLOCK_CLASSIFIERS["!"].pop(0)
+            del BLOCK_RENDERERS["ADMONITION"]
+
     def test_paragraph(self):
         md = """
 This is **bolded** paragraph
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+
+from templates import TemplateLoader, DependencyGraph
+from manifest import Manifest
+from split_nodes import generate_page_recursive, BuildContext
+
+
+class TestTemplates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.templates_dir = os.path.join(self.tmp.name, "templates")
+        self.write("partials/header.html", "<header>{{> nav }}</header>")
+        self.write("partials/nav.html", "<nav>home</nav>")
+        self.write("blog.html", "{{> header }}<main>{{ Content }}</main>")
+        self.default = os.path.join(self.tmp.name, "template.html")
+        with open(self.default, "w") as file:
+            file.write("<main>{{ Content }}</main>")
+        self.loader = TemplateLoader(self.templates_dir, "content")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.templates_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def test_section_template(self):
+        blog = self.loader.template_for(os.path.join("content", "blog", "tom", "index.md"), self.default)
+        self.assertEqual(blog, os.path.join(self.templates_dir, "blog.html"))
+        root = self.loader.template_for(os.path.join("content", "index.md"), self.default)
+        self.assertEqual(root, self.default)
+
+    def test_includes_expanded(self):
+        text, chain = self.loader.load(os.path.join(self.templates_dir, "blog.html"))
+        self.assertEqual(text, "<header><nav>home</nav></header><main>{{ Content }}</main>")
+        self.assertEqual([os.path.basename(path) for path in chain], ["blog.html", "header.html", "nav.html"])
+
+    def test_include_cycle(self):
+        self.write("partials/nav.html", "{{> header }}")
+        with self.assertRaises(ValueError):
+            self.loader.load(os.path.join(self.templates_dir, "blog.html"))
+
+    def test_missing_partial(self):
+        path = self.write("docs.html", "{{> footer }}")
+        with self.assertRaises(ValueError):
+            self.loader.load(path)
+
+    def test_dependency_graph(self):
+        blog = os.path.join(self.templates_dir, "blog.html")
+        dest = os.path.join(self.tmp.name, "index.html")
+        with open(dest, "w") as file:
+            file.write("page")
+        text, chain = self.loader.load(blog)
+        digest = self.loader.chain_digest(blog)
+        graph = DependencyGraph(Manifest(None))
+        self.assertFalse(graph.is_fresh(dest, "src", digest))
+        graph.record(dest, "index.md", "src", blog, chain, digest)
+        self.assertTrue(graph.is_fresh(dest, "src", digest))
+        self.assertEqual(graph.dependents(os.path.join(self.templates_dir, "partials", "nav.html")), [dest])
+        self.assertEqual(graph.changed_templates(), [])
+
+        self.write("partials/nav.html", "<nav>changed</nav>")
+        changed = TemplateLoader(self.templates_dir, "content").chain_digest(blog)
+        self.assertFalse(graph.is_fresh(dest, "src", changed))
+        self.assertEqual(graph.changed_templates(), [os.path.join(self.templates_dir, "partials", "nav.html")])
+        self.assertEqual(graph.changed_templates(), [])
+
+    def test_new_partial_reported_on_first_edit(self):
+        manifest = Manifest(None)
+        dest = os.path.join(self.tmp.name, "index.html")
+        self.write("blog.html", "<main>{{ Content }}</main>")
+        blog = os.path.join(self.templates_dir, "blog.html")
+        text, chain = TemplateLoader(self.templates_dir, "content").load(blog)
+        DependencyGraph(manifest).record(dest, "index.md", "src", blog, chain, "a")
+
+        self.write("blog.html", "{{> nav }}<main>{{ Content }}</main>")
+        graph = DependencyGraph(manifest)
+        self.assertEqual(graph.changed_templates(), [blog])
+        text, chain = TemplateLoader(self.templates_dir, "content").load(blog)
+        graph.record(dest, "index.md", "src", blog, chain, "b")
+
+        nav = self.write("partials/nav.html", "<nav>edited</nav>")
+        self.assertEqual(DependencyGraph(manifest).changed_templates(), [nav])
+
+    def test_prune_removes_unseen_pages(self):
+        manifest = Manifest(None)
+        stale = os.path.join(self.tmp.name, "stale.html")
+        with open(stale, "w") as file:
+            file.write("old")
+        with open(f"{stale}.gz", "wb") as file:
+            file.write(b"old")
+        manifest.set("gzip", f"{stale}:9", "digest")
+        DependencyGraph(manifest).record(stale, "stale.md", "x", self.default, [self.default], "y")
+        self.assertEqual(DependencyGraph(manifest).prune(), [stale])
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(f"{stale}.gz"))
+        self.assertEqual(manifest.entries["gzip"], {})
+
+    def test_full_build_between_incremental_builds(self):
+        content = os.path.join(self.tmp.name, "content")
+        os.makedirs(content)
+        with open(os.path.join(content, "index.md"), "w") as file:
+            file.write("# Title\n\n[home](/index.html)")
+        docs = os.path.join(self.tmp.name, "docs")
+        manifest = Manifest(None)
+
+        def build(basepath, incremental):
+            graph = DependencyGraph(manifest, basepath, incremental)
+            generate_page_recursive(content, self.default, docs, basepath, BuildContext(templates=self.loader, graph=graph))
+            with open(os.path.join(docs, "index.html")) as file:
+                return graph.fresh, file.read()
+
+        self.assertEqual(build("/X/", True)[0], 0)
+        self.assertIn('href="/Y/index.html"', build("/Y/", False)[1])
+        fresh, html = build("/X/", True)
+        self.assertEqual(fresh, 0)
+        self.assertIn('href="/X/index.html"', html)
+        self.assertEqual(build("/X/", True)[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()